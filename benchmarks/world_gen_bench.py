@@ -0,0 +1,167 @@
+"""Per-stage benchmarks for world generation across map sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.world_gen_bench --save benchmarks/baseline.json
+    python -m benchmarks.world_gen_bench --compare benchmarks/baseline.json --threshold 0.15
+    python -m benchmarks.world_gen_bench --sizes 100x80 512x512 --repeat 5
+
+Every stage is timed on its own with fixed seeds, and the best of
+``--repeat`` runs is kept. Compare mode exits with status 1 if any stage is
+slower than the baseline by more than the threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+from worldmap.generators.world_gen import WorldGenerator
+
+DEFAULT_SIZES = ['100x80', '256x256', '512x512', '1024x1024', '2048x2048', '4096x4096']
+DEFAULT_SEEDS = [1, 2, 3]
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must look like 100x80, got {value!r}")
+    return width, height
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def make_hex_grid(width: int, height: int):
+    """HexGrid loads tile images through pygame; keep its loading chatter out of the report."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from worldmap.grid.hex_grid import HexGrid
+    with contextlib.redirect_stdout(io.StringIO()):
+        return HexGrid(width, height)
+
+
+def bench_world(width: int, height: int, seed: int, hex_grid=None) -> Dict[str, float]:
+    """Seconds per stage for one world, in pipeline order."""
+    generator = WorldGenerator(width=width, height=height, seed=seed)
+    timings = {}
+
+    fields = {}
+    for name, params in generator.noise_fields.items():
+        fields[name], timings[f'noise:{name}'] = timed(generator.generate_noise, **params)
+
+    rows = np.arange(height)[:, None]
+    (elevation, temperature, moisture), timings['apply_climate'] = timed(
+        generator.apply_climate, fields['elevation'], fields['temperature'], fields['moisture'], rows
+    )
+    water, timings['hydrology'] = timed(generator.generate_hydrology, elevation)
+    moisture = generator.apply_water(moisture, water)
+    biome_map, timings['biome_map'] = timed(generator.generate_biome_map, elevation, temperature, moisture)
+    terrain, timings['terrain_features'] = timed(
+        generator.generate_terrain_features, biome_map, elevation, moisture, mode=generator.terrain_mode
+    )
+    generator.place_lakes(terrain, water, biome_map)
+
+    if hex_grid is not None:
+        world_data = {'terrain_height': elevation, 'terrain_types': terrain, 'biomes': biome_map}
+        _, timings['hex_grid_fill'] = timed(hex_grid.load_world, world_data)
+
+    timings['total'] = sum(timings.values())
+    return timings
+
+
+def run(sizes: List[str], seeds: List[int], repeat: int, hex_grid_fill: bool) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Best time per stage for every size and seed: results[size][seed][stage]."""
+    results = {}
+    for size in sizes:
+        width, height = parse_size(size)
+        hex_grid = None
+        if hex_grid_fill:
+            hex_grid = make_hex_grid(width, height)
+
+        results[size] = {}
+        for seed in seeds:
+            best = {}
+            for _ in range(repeat):
+                for stage, seconds in bench_world(width, height, seed, hex_grid).items():
+                    best[stage] = min(seconds, best.get(stage, float('inf')))
+            results[size][str(seed)] = best
+            print(f"{size:>10} seed {seed:<6} " + '  '.join(f"{stage} {seconds:.4f}s" for stage, seconds in best.items()),
+                  file=sys.stderr)
+    return results
+
+
+def compare(baseline: Dict, current: Dict, threshold: float, min_seconds: float = 0.0) -> List[str]:
+    """Describe every stage that got slower than ``baseline`` by more than ``threshold``.
+
+    Slowdowns smaller than ``min_seconds`` are ignored, since stages that
+    take a millisecond or two mostly measure timer noise.
+    """
+    regressions = []
+    for size, seeds in current['results'].items():
+        for seed, stages in seeds.items():
+            old_stages = baseline['results'].get(size, {}).get(seed, {})
+            for stage, seconds in stages.items():
+                old = old_stages.get(stage)
+                if old and seconds > old * (1 + threshold) and seconds - old >= min_seconds:
+                    regressions.append(f"{size} seed {seed} {stage}: {old:.4f}s -> {seconds:.4f}s "
+                                       f"(+{(seconds / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark world generation stages across map sizes.")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="map sizes as WIDTHxHEIGHT")
+    parser.add_argument('--seeds', nargs='+', type=int, default=DEFAULT_SEEDS)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per size and seed; the fastest is kept")
+    parser.add_argument('--no-hex-grid', action='store_true', help="skip the HexGrid fill, which needs pygame")
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed slowdown per stage before it counts as a regression (0.10 = 10%%)")
+    parser.add_argument('--min-seconds', type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        parse_size(size)
+
+    current = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'repeat': args.repeat
+        },
+        'results': run(args.sizes, args.seeds, args.repeat, not args.no_hex_grid)
+    }
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.min_seconds)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage slower than the baseline by more than {args.threshold * 100:.0f}%")
+    elif not args.save:
+        json.dump(current, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+from typing import Callable, Dict, Hashable, List, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+def grid_distance(a0: int, b0: int, a1: int, b1: int) -> int:
+    """Steps between two cells of a square grid, diagonals included."""
+    return max(abs(a0 - a1), abs(b0 - b1))
+
+
+class SpatialIndex:
+    """Which units stand where, for square tactical grids and the hex world map alike.
+
+    Cells are (a, b) pairs: (x, y) on the tactical grid, (row, col) on
+    the hex map. Every unit id is filed under its cell and under the
+    coarser ``bucket_size`` square bucket holding that cell, both in
+    dicts of sets, so insert, move and remove are O(1) and a cell's
+    occupants are one lookup. Area queries only visit the buckets that
+    overlap the area, so they cost in proportion to the area and the
+    units in it rather than to every unit on the map.
+
+    ``distance(a0, b0, a1, b1)`` measures radius queries; pass
+    worldmap.pathfinding.hex_distance for the hex map. Any cell within
+    hex distance r of another is also within r rows and r columns of it,
+    so the same bucket search serves both.
+    """
+
+    def __init__(self, bucket_size: int = 8,
+                 distance: Callable[[int, int, int, int], float] = grid_distance):
+        self.bucket_size = bucket_size
+        self.distance = distance
+        self.positions: Dict[Hashable, Cell] = {}
+        self.cells: Dict[Cell, Set[Hashable]] = {}
+        self.buckets: Dict[Cell, Set[Hashable]] = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, unit_id):
+        return unit_id in self.positions
+
+    def bucket_of(self, cell: Cell) -> Cell:
+        return cell[0] // self.bucket_size, cell[1] // self.bucket_size
+
+    def insert(self, unit_id: Hashable, cell: Cell):
+        """File ``unit_id`` at ``cell``; a unit already indexed is moved there."""
+        if unit_id in self.positions:
+            self.move(unit_id, cell)
+            return
+        cell = (cell[0], cell[1])
+        self.positions[unit_id] = cell
+        self.cells.setdefault(cell, set()).add(unit_id)
+        self.buckets.setdefault(self.bucket_of(cell), set()).add(unit_id)
+
+    def move(self, unit_id: Hashable, cell: Cell):
+        """Move an indexed unit to ``cell``; raises KeyError for unknown units."""
+        old = self.positions[unit_id]
+        cell = (cell[0], cell[1])
+        if cell == old:
+            return
+        self._discard(self.cells, old, unit_id)
+        self.cells.setdefault(cell, set()).add(unit_id)
+        old_bucket, bucket = self.bucket_of(old), self.bucket_of(cell)
+        if bucket != old_bucket:
+            self._discard(self.buckets, old_bucket, unit_id)
+            self.buckets.setdefault(bucket, set()).add(unit_id)
+        self.positions[unit_id] = cell
+
+    def remove(self, unit_id: Hashable):
+        """Drop a unit from the index; unknown ids are ignored."""
+        cell = self.positions.pop(unit_id, None)
+        if cell is None:
+            return
+        self._discard(self.cells, cell, unit_id)
+        self._discard(self.buckets, self.bucket_of(cell), unit_id)
+
+    def _discard(self, table: Dict[Cell, Set[Hashable]], key: Cell, unit_id: Hashable):
+        # Empty sets are dropped so the tables only hold occupied cells and buckets
+        members = table[key]
+        members.discard(unit_id)
+        if not members:
+            del table[key]
+
+    def position(self, unit_id: Hashable) -> Cell:
+        return self.positions[unit_id]
+
+    def occupied(self, cell: Cell) -> bool:
+        return (cell[0], cell[1]) in self.cells
+
+    def at(self, cell: Cell) -> List[Hashable]:
+        """Ids of the units in ``cell``."""
+        return list(self.cells.get((cell[0], cell[1]), ()))
+
+    def in_rect(self, a_start: int, b_start: int, a_end: int, b_end: int) -> List[Hashable]:
+        """Ids of the units in cells a_start <= a < a_end, b_start <= b < b_end."""
+        if a_start >= a_end or b_start >= b_end:
+            return []
+        size = self.bucket_size
+        found = []
+        for bucket_a in range(a_start // size, (a_end - 1) // size + 1):
+            # Buckets wholly inside the rectangle need no per-unit check
+            inside_a = a_start <= bucket_a * size and (bucket_a + 1) * size <= a_end
+            for bucket_b in range(b_start // size, (b_end - 1) // size + 1):
+                members = self.buckets.get((bucket_a, bucket_b))
+                if not members:
+                    continue
+                if inside_a and b_start <= bucket_b * size and (bucket_b + 1) * size <= b_end:
+                    found.extend(members)
+                    continue
+                for unit_id in members:
+                    a, b = self.positions[unit_id]
+                    if a_start <= a < a_end and b_start <= b < b_end:
+                        found.append(unit_id)
+        return found
+
+    def in_radius(self, cell: Cell, radius: int) -> List[Hashable]:
+        """Ids of the units within ``radius`` of ``cell`` by ``distance``, the cell itself included."""
+        a0, b0 = cell
+        if radius == 0:
+            return self.at(cell)
+        distance, positions = self.distance, self.positions
+        return [unit_id for unit_id in self.in_rect(a0 - radius, b0 - radius, a0 + radius + 1, b0 + radius + 1)
+                if distance(a0, b0, *positions[unit_id]) <= radius]
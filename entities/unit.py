@@ -1,8 +1,12 @@
+import itertools
 import pygame
 from settings import TILE_SIZE
 
 class Unit:
+    _ids = itertools.count()  # Unique per unit, used as its key in a SpatialIndex
+
     def __init__(self, x, y, color):
+        self.id = next(Unit._ids)
         self.x = x
         self.y = y
         self.color = color
@@ -2,12 +2,15 @@ import pygame
 import sys
 import numpy as np
 from worldmap.generators.world_gen import WorldGenerator
+from worldmap.generators.chunk_cache import ChunkCache
+from worldmap.generators.pregen import WorldPregenerator
 from worldmap.display.world_renderer import WorldRenderer
 from settings import *
 from menu import Menu, WHITE, BLACK, GRAY
 from title_screen import TitleScreen
 from worldmap.grid import HexGrid
 from worldmap.display.tile_manager import TileManager
+from worldmap.fov import FieldOfView
 
 
 # Initialize Pygame
@@ -25,30 +28,71 @@ class Game:
         self.current_state = 'menu'
         self.world_state = None
         self.selected_ship_name = None
+        self.loading_font = pygame.font.Font(None, 48)
+        # Fixed-size worlds are generated in the background while the menus are up
+        self.pregenerator = None if WORLD_STREAMING else WorldPregenerator(
+            WORLD_MAP_WIDTH, WORLD_MAP_HEIGHT, seed=WORLD_SEED,
+            cache_dir=WORLD_CACHE_DIR, cache_size=WORLD_CACHE_SIZE
+        )
 
     def run(self):
         while True:
             if self.current_state == 'menu':
+                if self.pregenerator:
+                    self.pregenerator.start()
                 selected_option = self.menu.run()
                 if selected_option == "Start":
                     self.current_state = 'title'
                 elif selected_option == "Quit":
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
             elif self.current_state == 'title':
                 self.selected_ship_name = self.title_screen.run()  # Store the returned ship name
                 if self.selected_ship_name:  # Only proceed if a ship name was returned
-                    self.current_state = 'game'
-                    self.world_state = WorldMapState()
+                    self.current_state = 'loading'
+            elif self.current_state == 'loading':
+                self.run_loading()
             elif self.current_state == 'game':
                 self.run_game()
 
+    def quit(self):
+        if self.pregenerator:
+            self.pregenerator.shutdown()
+        pygame.quit()
+        sys.exit()
+
+    def run_loading(self):
+        """Show a progress indicator until the pre-generated world is ready."""
+        start_time = pygame.time.get_ticks()
+        while self.pregenerator and not self.pregenerator.ready():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.quit()
+            self.draw_loading(pygame.time.get_ticks() - start_time)
+            pygame.display.flip()
+            self.clock.tick(FPS)
+        
+        self.world_state = WorldMapState(pregenerator=self.pregenerator)
+        self.current_state = 'game'
+
+    def draw_loading(self, elapsed_ms):
+        self.screen.fill(BLACK)
+        text = self.loading_font.render("Generating world...", True, WHITE)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40))
+        self.screen.blit(text, text_rect)
+        
+        # Sweep a block along the bar while waiting on the worker
+        bar = pygame.Rect(0, 0, 400, 20)
+        bar.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20)
+        pygame.draw.rect(self.screen, WHITE, bar, 2)
+        block_width = bar.width // 4
+        sweep = (elapsed_ms // 4) % (bar.width - block_width)
+        pygame.draw.rect(self.screen, WHITE, (bar.x + sweep, bar.y, block_width, bar.height))
+
     def run_game(self):
         while self.current_state == 'game':
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.current_state = 'menu'
@@ -62,10 +106,13 @@ class Game:
             self.clock.tick(FPS)
 
 class WorldMapState:
-    def __init__(self):
-        map_width = 100
-        map_height = 80
-        self.world_generator = WorldGenerator(width=map_width, height=map_height)
+    def __init__(self, streaming=WORLD_STREAMING, pregenerator=None):
+        map_width = WORLD_MAP_WIDTH
+        map_height = WORLD_MAP_HEIGHT
+        self.streaming = streaming  # Generate chunks around the camera instead of one fixed map
+        self.pregenerator = pregenerator  # Source of ready-made worlds, if any
+        self.world_generator = None
+        self.chunk_cache = None
         self.world_renderer = WorldRenderer(SCREEN_WIDTH, SCREEN_HEIGHT)
         self.hex_grid = HexGrid(map_width, map_height)
         self.tile_manager = TileManager()
@@ -75,6 +122,13 @@ class WorldMapState:
         self.camera_y = 0
         self.tile_variants = {}
         self.camera_speed = 10
+        self.hover_cell = None  # (row, col) under the mouse, if any
+        # Sight over the fixed map; the cell at the centre of the screen stands in for the player
+        self.fog = FieldOfView(self.hex_grid, radius=SIGHT_RADIUS) if FOG_OF_WAR and not streaming else None
+        
+        # Screen position of the top-left corner of cell (0, 0) before camera movement
+        self.map_offset_x = 90  # Adjust this value to move the entire map right/left
+        self.map_offset_y = 20  # Adjust this value to move the entire map up/down
         
         # Initialize the mappings
         self.biome_mapping = {
@@ -120,22 +174,84 @@ class WorldMapState:
             self.camera_y += self.camera_speed
         if keys[pygame.K_DOWN]:
             self.camera_y -= self.camera_speed
+        
+        # Only the chunks around the camera are generated and kept
+        if self.streaming and (self.camera_x, self.camera_y) != old_camera:
+            self.chunk_cache.ensure_region(*self.visible_region())
+        
+        rows, cols, hit = self.screen_to_cells(*pygame.mouse.get_pos())
+        self.hover_cell = (int(rows), int(cols)) if hit else None
+        
+        if self.fog:
+            rows, cols, hit = self.screen_to_cells(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+            if hit:
+                self.fog.update((int(rows), int(cols)))
+
+    def screen_to_cells(self, screen_x, screen_y):
+        """Rows, columns and hit mask of the cells under screen points (scalars or arrays); see HexGrid.pick_cells."""
+        return self.hex_grid.pick_cells(screen_x, screen_y,
+                                        origin_x=self.camera_x + self.map_offset_x,
+                                        origin_y=self.camera_y + self.map_offset_y,
+                                        clip=not self.streaming)
 
     def generate_new_world(self):
         self.tile_variants = {}
-        self.world_data = self.world_generator.generate_world_map()
-        for y in range(self.hex_grid.height):
-            for x in range(self.hex_grid.width):
-                tile_data = {
-                    'terrain': self.world_data['terrain_types'][y][x],
-                    'biome': self.world_data['biomes'][y][x],
-                    'height': self.world_data['terrain_height'][y][x]
-                }
-                self.hex_grid.set_tile(y, x, tile_data)
+        if self.pregenerator and not self.streaming:
+            # Swap to the speculatively generated world; another one is queued behind it
+            self.world_generator, self.world_data = self.pregenerator.take()
+        else:
+            # Worlds are reproducible per seed, so a new world needs a new generator
+            self.world_generator = WorldGenerator(
+                width=self.hex_grid.width, height=self.hex_grid.height, seed=WORLD_SEED, chunk_size=CHUNK_SIZE
+            )
+            if self.streaming:
+                # Chunks are generated as the camera reaches them
+                self.chunk_cache = ChunkCache(self.world_generator, capacity=CHUNK_CACHE_SIZE)
+                self.chunk_cache.ensure_region(*self.visible_region())
+                return
+            self.world_data = self.world_generator.cached_world_map(WORLD_CACHE_DIR, keep=WORLD_CACHE_SIZE)
+        self.hex_grid.load_world(self.world_data)
+        if self.fog:
+            self.fog.reset()
+
+    def get_tile(self, row, col):
+        """Get tile data from the chunk cache or the fixed grid."""
+        if self.streaming:
+            return self.chunk_cache.get_tile(row, col)
+        return self.hex_grid.get_tile(row, col)
+
+    def visible_region(self):
+        """Rows and columns [start, end) that can appear on screen for the current camera."""
+        hex_width = self.hex_grid.tile_manager.hex_width
+        hex_vert_offset = int(self.hex_grid.tile_manager.hex_vert_offset)
+        
+        # Calculate visible area
+        visible_width = (SCREEN_WIDTH // hex_width) + 4
+        visible_height = (SCREEN_HEIGHT // hex_vert_offset) + 4
+        
+        # Calculate starting position
+        start_row = -self.camera_y // hex_vert_offset
+        start_col = -self.camera_x // hex_width
+        end_row = start_row + visible_height + 4
+        end_col = start_col + visible_width + 4
+        if self.streaming:
+            return int(start_row), int(end_row), int(start_col), int(end_col)
+        
+        # Clamp to the fixed map
+        start_row = max(0, start_row)
+        start_col = max(0, start_col)
+        end_row = min(self.hex_grid.height, start_row + visible_height + 4)
+        end_col = min(self.hex_grid.width, start_col + visible_width + 4)
+        return int(start_row), int(end_row), int(start_col), int(end_col)
 
     def get_tile_variant(self, row, col, biome, terrain):
         """Get a consistent tile variant for a given position."""
-        key = (row, col, str(biome), str(terrain))
+        if self.streaming:
+            # Derive the variant from the position so nothing accumulates per explored tile
+            variant = (row * 73856093) ^ (col * 19349663)
+            return self.tile_manager.get_tile(biome, terrain, variant=variant)
+        
+        key = (row, col, int(biome), int(terrain))
         if key in self.tile_variants:
             return self.tile_variants[key]
         
@@ -153,50 +269,57 @@ class WorldMapState:
         # Get tile dimensions
         hex_width = self.hex_grid.tile_manager.hex_width
         hex_height = self.hex_grid.tile_manager.hex_height
-        hex_vert_offset = int(self.hex_grid.tile_manager.hex_vert_offset)
-        
-        # Add an initial offset to adjust the starting position of the entire map
-        initial_x_offset = 90  # Adjust this value to move the entire map right/left
-        initial_y_offset = 20   # Adjust this value to move the entire map up/down
-        
-        # Calculate visible area
-        visible_width = (SCREEN_WIDTH // hex_width) + 4
-        visible_height = (SCREEN_HEIGHT // hex_vert_offset) + 4
-        
-        # Calculate starting position
-        start_row = max(0, -self.camera_y // hex_vert_offset)
-        start_col = max(0, -self.camera_x // hex_width)
         
-        # Calculate end positions
-        end_row = min(self.hex_grid.height, start_row + visible_height + 4)
-        end_col = min(self.hex_grid.width, start_col + visible_width + 4)
+        # Unexplored cells stay black, explored ones out of sight are darkened
+        fog_shade = None
+        if self.fog:
+            fog_shade = pygame.Surface((hex_width, hex_height), pygame.SRCALPHA)
+            pygame.draw.polygon(fog_shade, (0, 0, 0, 150), self.hex_points(0, 0))
         
         # Draw visible tiles
-        for row in range(int(start_row), int(end_row)):
-            for col in range(int(start_col), int(end_col)):
+        start_row, end_row, start_col, end_col = self.visible_region()
+        for row in range(start_row, end_row):
+            for col in range(start_col, end_col):
                 x, y = self.hex_grid.get_hex_position(row, col)
-                x += self.camera_x + initial_x_offset  # Add initial offset to x
-                y += self.camera_y + initial_y_offset  # Add initial offset to y
+                x += self.camera_x + self.map_offset_x  # Add initial offset to x
+                y += self.camera_y + self.map_offset_y  # Add initial offset to y
                 
                 # Only draw if the tile would be visible
                 if (-hex_width <= x <= SCREEN_WIDTH and 
                     -hex_height <= y <= SCREEN_HEIGHT):
-                    tile = self.hex_grid.get_tile(row, col)
+                    if self.fog and not self.fog.explored[row, col]:
+                        continue
+                    tile = self.get_tile(row, col)
                     if tile:
                         tile_image = self.get_tile_variant(row, col, tile['biome'], tile['terrain'])
                         if tile_image:
                             screen.blit(tile_image, (x, y))
                             
                             # Draw border
-                            points = [
-                                (x + hex_width//2, y),              # Top
-                                (x + hex_width, y + hex_height//4), # Upper right
-                                (x + hex_width, y + hex_height*3//4), # Lower right
-                                (x + hex_width//2, y + hex_height),   # Bottom
-                                (x, y + hex_height*3//4),           # Lower left
-                                (x, y + hex_height//4)              # Upper left
-                            ]
-                            pygame.draw.polygon(screen, (100, 100, 100), points, 1)
+                            pygame.draw.polygon(screen, (100, 100, 100), self.hex_points(x, y), 1)
+                            
+                            if fog_shade and not self.fog.visible[row, col]:
+                                screen.blit(fog_shade, (x, y))
+        
+        # Outline the hex under the mouse over its neighbours
+        if self.hover_cell:
+            x, y = self.hex_grid.get_hex_position(*self.hover_cell)
+            x += self.camera_x + self.map_offset_x
+            y += self.camera_y + self.map_offset_y
+            pygame.draw.polygon(screen, (255, 255, 255), self.hex_points(x, y), 2)
+
+    def hex_points(self, x, y):
+        """Outline of the hex whose tile is drawn at (x, y)."""
+        hex_width = self.hex_grid.tile_manager.hex_width
+        hex_height = self.hex_grid.tile_manager.hex_height
+        return [
+            (x + hex_width//2, y),              # Top
+            (x + hex_width, y + hex_height//4), # Upper right
+            (x + hex_width, y + hex_height*3//4), # Lower right
+            (x + hex_width//2, y + hex_height),   # Bottom
+            (x, y + hex_height*3//4),           # Lower left
+            (x, y + hex_height//4)              # Upper left
+        ]
 
 if __name__ == '__main__':
     game = Game()
@@ -5,6 +5,18 @@ GRID_WIDTH = SCREEN_WIDTH // TILE_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // TILE_SIZE
 FPS = 60
 
+# World map generation
+WORLD_MAP_WIDTH = 100
+WORLD_MAP_HEIGHT = 80
+WORLD_STREAMING = False  # Generate the world chunk by chunk around the camera
+CHUNK_SIZE = 32
+CHUNK_CACHE_SIZE = 64
+WORLD_SEED = None  # Fixed seed for new worlds, None for a random one each time
+WORLD_CACHE_DIR = 'world_cache'  # Generated worlds are stored here and memory-mapped on reuse
+WORLD_CACHE_SIZE = 8  # Number of worlds kept in WORLD_CACHE_DIR
+FOG_OF_WAR = False  # Hide unexplored cells and shade those out of sight (fixed map only); off until a unit walks the map
+SIGHT_RADIUS = 6  # Rings of hexes seen from flat ground
+
 # Temporary options for characters delete this later
 WHITE = (255, 255, 255)
 GRAY = (200, 200, 200)
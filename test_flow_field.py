@@ -0,0 +1,78 @@
+# test_flow_field.py
+import heapq
+import math
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import numpy as np
+from worldmap.grid import HexGrid
+from worldmap.flow_field import FlowField
+from worldmap.pathfinding import PathFinder
+from worldmap.config.world_settings import Terrain
+
+
+def random_grid(width, height, seed):
+    rng = np.random.default_rng(seed)
+    grid = HexGrid(width, height)
+    choices = [Terrain.GROUND, Terrain.HILLS, Terrain.FOREST, Terrain.MOUNTAIN, Terrain.LAKES]
+    terrain = grid.add_layer('terrain_types', np.uint8)
+    terrain[:] = rng.choice(choices, size=(height, width), p=[0.5, 0.15, 0.15, 0.1, 0.1])
+    grid.mark_changed()
+    return grid
+
+
+def cost_to_goal(grid, costs, goal, max_cost=math.inf):
+    """Reverse Dijkstra: cheapest cost from every passable cell to ``goal``, paying entry costs."""
+    integration = np.full(costs.shape, np.inf)
+    integration[goal] = 0.0
+    heap = [(0.0, goal)]
+    while heap:
+        cost, cell = heapq.heappop(heap)
+        if cost > integration[cell]:
+            continue
+        for neighbor in grid.neighbors.around(*cell):
+            new_cost = cost + costs[cell]
+            if math.isfinite(costs[neighbor]) and new_cost <= max_cost and new_cost < integration[neighbor]:
+                integration[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, neighbor))
+    return integration
+
+
+def check_field(field, grid, max_cost=math.inf):
+    costs = PathFinder(grid).cost_layer()
+    assert np.array_equal(field.integration, cost_to_goal(grid, costs, field.goal, max_cost))
+    # Every step leads one cell downhill along a cheapest path
+    integration = field.integration.ravel()
+    walkers = np.flatnonzero(np.isfinite(integration) & (integration > 0))
+    steps = field.next_index[walkers]
+    assert (steps >= 0).all()
+    assert np.array_equal(integration[steps] + costs.ravel()[steps], integration[walkers])
+
+
+def test_field_matches_dijkstra():
+    grid = random_grid(30, 24, seed=23)
+    costs = PathFinder(grid).cost_layer()
+    goals = [tuple(cell) for cell in np.argwhere(np.isfinite(costs))[::97]]
+    for max_cost in (None, 8.0):
+        field = FlowField(grid, max_cost=max_cost)
+        for goal in goals:
+            check_field(field.update(goal), grid, math.inf if max_cost is None else max_cost)
+
+
+def test_repair_after_costs_drop():
+    grid = random_grid(30, 24, seed=24)
+    costs = PathFinder(grid).cost_layer()
+    goal = tuple(np.argwhere(np.isfinite(costs))[0])
+    field = FlowField(grid).update(goal)
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        # Clear a few cells to Ground: costs only drop, so the field is repaired in place
+        rows, cols = rng.integers(grid.height, size=6), rng.integers(grid.width, size=6)
+        grid.terrain[rows, cols] = Terrain.GROUND
+        grid.mark_changed()
+        check_field(field.update(goal), grid)
+
+
+if __name__ == "__main__":
+    test_field_matches_dijkstra()
+    test_repair_after_costs_drop()
+    print("ok")
@@ -0,0 +1,20 @@
+# test_noise.py
+import numpy as np
+from opensimplex import OpenSimplex
+from worldmap.generators.noise import SimplexNoise
+
+
+def test_grid_matches_opensimplex():
+    noise = SimplexNoise(seed=4242)
+    scalar = OpenSimplex(seed=4242)
+    # Negative, fractional and lattice-aligned coordinates
+    xs = np.linspace(-7.3, 11.9, 37)
+    ys = np.concatenate([np.linspace(-5.0, 5.0, 21), [0.0, 1.0, 2.5]])
+    grid = noise.noise2_grid(xs, ys)
+    expected = np.array([[scalar.noise2(x, y) for x in xs] for y in ys])
+    assert np.array_equal(grid, expected)
+
+
+if __name__ == "__main__":
+    test_grid_matches_opensimplex()
+    print("ok")
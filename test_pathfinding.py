@@ -0,0 +1,85 @@
+# test_pathfinding.py
+import heapq
+import math
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import numpy as np
+from worldmap.grid import HexGrid
+from worldmap.pathfinding import PathFinder, hex_distance
+from worldmap.config.world_settings import Terrain
+
+
+def random_grid(width, height, seed):
+    """Grid of mixed terrain with enough Mountain and Lakes to split it into islands."""
+    rng = np.random.default_rng(seed)
+    grid = HexGrid(width, height)
+    choices = [Terrain.GROUND, Terrain.HILLS, Terrain.FOREST, Terrain.RUINS, Terrain.MOUNTAIN, Terrain.LAKES]
+    terrain = grid.add_layer('terrain_types', np.uint8)
+    terrain[:] = rng.choice(choices, size=(height, width), p=[0.4, 0.15, 0.15, 0.05, 0.15, 0.1])
+    grid.mark_changed()
+    return grid
+
+
+def dijkstra(grid, costs, start):
+    """Cheapest cost from ``start`` to every cell it reaches, paying each cell's cost on entry."""
+    best = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        cost, cell = heapq.heappop(heap)
+        if cost > best[cell]:
+            continue
+        for neighbor in grid.neighbors.around(*cell):
+            new_cost = cost + costs[neighbor]
+            if new_cost < best.get(neighbor, math.inf):
+                best[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, neighbor))
+    return best
+
+
+def check_paths(finder, grid, rng, queries):
+    costs = finder.cost_layer()
+    for _ in range(queries):
+        start = (int(rng.integers(grid.height)), int(rng.integers(grid.width)))
+        goal = (int(rng.integers(grid.height)), int(rng.integers(grid.width)))
+        reference = dijkstra(grid, costs, start)
+        path = finder.find_path(start, goal)
+        if math.isinf(reference.get(goal, math.inf)):
+            assert path is None, (start, goal)
+            continue
+        assert path[0] == start and path[-1] == goal
+        assert all(hex_distance(*a, *b) == 1 for a, b in zip(path, path[1:]))
+        assert finder.path_cost(path) == reference[goal], (start, goal)
+
+
+def test_paths_match_dijkstra():
+    grid = random_grid(24, 18, seed=22)
+    for landmarks in (None, 0):
+        check_paths(PathFinder(grid, landmarks=landmarks), grid, np.random.default_rng(1), 150)
+
+
+def test_impassable_start():
+    grid = HexGrid(20, 20)
+    terrain = grid.add_layer('terrain_types', np.uint8, Terrain.GROUND)
+    terrain[5, 5] = Terrain.MOUNTAIN
+    grid.mark_changed()
+    for landmarks in (None, 0):
+        path = PathFinder(grid, landmarks=landmarks).find_path((5, 5), (10, 10))
+        assert path is not None and len(path) == 8
+
+
+def test_reachable_matches_dijkstra():
+    grid = random_grid(24, 18, seed=23)
+    finder = PathFinder(grid)
+    costs = finder.cost_layer()
+    for start in ((0, 0), (9, 12), (17, 23)):
+        if math.isinf(costs[start]):
+            continue
+        reference = {cell: cost for cell, cost in dijkstra(grid, costs, start).items() if cost <= 6.0}
+        assert finder.reachable(start, 6.0) == reference
+
+
+if __name__ == "__main__":
+    test_paths_match_dijkstra()
+    test_impassable_start()
+    test_reachable_matches_dijkstra()
+    print("ok")
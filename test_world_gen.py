@@ -0,0 +1,34 @@
+# test_world_gen.py
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from worldmap.generators.world_gen import WorldGenerator
+
+
+def test_process_pool_after_regenerate():
+    generator = WorldGenerator(width=64, height=48, seed=17080)
+    generator.regenerate_world_map()
+    generator.add_stage_hook(lambda event, name, info: None)
+    expected = generator.generate_world_map()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        world = generator.generate_world_map(executor)
+    for name in ('biomes', 'terrain_types', 'terrain_height'):
+        assert np.array_equal(world[name], expected[name])
+
+
+def test_executor_does_not_change_world():
+    for mode in ('weighted', 'raster', 'wavefront'):
+        generator = WorldGenerator(width=48, height=160, seed=606)  # Three row bands
+        generator.terrain_mode = mode
+        expected = generator.generate_world_map()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            world = generator.generate_world_map(executor)
+        assert world.keys() == expected.keys()
+        for name, layer in expected.items():
+            if isinstance(layer, np.ndarray):
+                assert np.array_equal(world[name], layer), (mode, name)
+
+
+if __name__ == "__main__":
+    test_process_pool_after_regenerate()
+    test_executor_does_not_change_world()
+    print("ok")
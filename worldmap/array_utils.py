@@ -0,0 +1,8 @@
+import numpy as np
+
+
+def distinct(values: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """Drop repeated values in O(len(values)); ``scratch`` must be indexable by every value."""
+    positions = np.arange(values.size)
+    scratch[values] = positions
+    return values[scratch[values] == positions]
@@ -0,0 +1,129 @@
+"""Headless batch world generation for seed sweeps.
+
+Generates one world per seed in a process pool and reports summary
+statistics per world, without importing pygame:
+
+    python -m worldmap.batch_gen --start 0 --count 200 --output sweep.csv
+    python -m worldmap.batch_gen --start 0 --count 50 --size 256x192 --format json
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List
+import numpy as np
+from .generators.world_gen import WorldGenerator
+from .config.world_settings import Biome, Terrain, BIOME_NAMES, TERRAIN_NAMES
+
+
+def world_stats(seed: int, width: int, height: int, terrain_mode: str = 'weighted') -> Dict[str, Any]:
+    """Generate the world for ``seed`` and summarise it."""
+    generator = WorldGenerator(width=width, height=height, seed=seed)
+    generator.terrain_mode = terrain_mode
+    start = time.perf_counter()
+    world_data = generator.generate_world_map()
+    seconds = time.perf_counter() - start
+
+    biome_counts = np.bincount(world_data['biomes'].ravel(), minlength=len(BIOME_NAMES))
+    terrain_counts = np.bincount(world_data['terrain_types'].ravel(), minlength=len(TERRAIN_NAMES))
+    return {
+        'seed': seed,
+        'width': width,
+        'height': height,
+        'seconds': round(seconds, 4),
+        'ocean_fraction': round(float(biome_counts[Biome.OCEAN]) / (width * height), 4),
+        'ruins': int(terrain_counts[Terrain.RUINS]),
+        'river_cells': int(np.count_nonzero(world_data['rivers'])),
+        'lake_cells': int(np.count_nonzero(world_data['lakes'])),
+        'biomes': {name: int(count) for name, count in zip(BIOME_NAMES, biome_counts)},
+        'terrain': {name: int(count) for name, count in zip(TERRAIN_NAMES, terrain_counts)},
+        'missing_biomes': [name for name, count in zip(BIOME_NAMES, biome_counts) if count == 0]
+    }
+
+
+def _world_stats(args):
+    return world_stats(*args)
+
+
+def sweep(seeds: List[int], width: int, height: int, workers: int = None,
+          terrain_mode: str = 'weighted') -> List[Dict[str, Any]]:
+    """Stats for every seed, in seed order; ``workers=1`` runs in this process."""
+    tasks = [(seed, width, height, terrain_mode) for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [world_stats(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(tasks) // (4 * workers))
+        return list(executor.map(_world_stats, tasks, chunksize=chunksize))
+
+
+def flatten(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """One CSV row per world, with a column per biome and terrain type."""
+    row = {key: stats[key] for key in ('seed', 'width', 'height', 'seconds', 'ocean_fraction', 'ruins',
+                                       'river_cells', 'lake_cells')}
+    row.update({f'biome_{name}': count for name, count in stats['biomes'].items()})
+    row.update({f'terrain_{name}': count for name, count in stats['terrain'].items()})
+    row['missing_biomes'] = ' '.join(stats['missing_biomes'])
+    return row
+
+
+def write_report(results: List[Dict[str, Any]], out, fmt: str):
+    if fmt == 'json':
+        json.dump({
+            'worlds': results,
+            'degenerate_seeds': [stats['seed'] for stats in results if stats['missing_biomes']],
+            'total_seconds': round(sum(stats['seconds'] for stats in results), 4)
+        }, out, indent=2)
+        out.write('\n')
+        return
+
+    rows = [flatten(stats) for stats in results]
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else ['seed'])
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def parse_size(value: str):
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must look like 100x80, got {value!r}")
+    return width, height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate worlds headlessly across a seed range and report stats.")
+    parser.add_argument('--start', type=int, default=0, help="first seed")
+    parser.add_argument('--count', type=int, default=100, help="number of consecutive seeds")
+    parser.add_argument('--size', type=parse_size, default=(100, 80), help="world size as WIDTHxHEIGHT")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--terrain-mode', choices=['weighted', 'raster', 'wavefront'], default='weighted')
+    parser.add_argument('--format', choices=['csv', 'json'], default=None,
+                        help="report format (default: from the output extension, else csv)")
+    parser.add_argument('--output', '-o', default=None, help="report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = 'json' if args.output and args.output.lower().endswith('.json') else 'csv'
+
+    width, height = args.size
+    seeds = list(range(args.start, args.start + args.count))
+    results = sweep(seeds, width, height, workers=args.workers, terrain_mode=args.terrain_mode)
+
+    if args.output:
+        with open(args.output, 'w', newline='') as out:
+            write_report(results, out, fmt)
+    else:
+        write_report(results, sys.stdout, fmt)
+
+    degenerate = [stats['seed'] for stats in results if stats['missing_biomes']]
+    if degenerate:
+        print(f"{len(degenerate)} of {len(results)} worlds are missing a biome: {degenerate}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
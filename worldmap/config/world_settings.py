@@ -0,0 +1,56 @@
+from enum import IntEnum
+from typing import Union
+import numpy as np
+
+
+class Biome(IntEnum):
+    """Biome ids stored in uint8 world layers."""
+    OCEAN = 0
+    DESERT = 1
+    SCORCHED = 2
+    GRASSLAND = 3
+    TUNDRA = 4
+    WASTELAND = 5
+
+
+class Terrain(IntEnum):
+    """Terrain ids stored in uint8 world layers."""
+    OCEAN = 0
+    GROUND = 1
+    HILLS = 2
+    MOUNTAIN = 3
+    FOREST = 4
+    LAKES = 5
+    RUINS = 6
+
+
+# Display names, indexed by id; these are the names used by BiomeRules and the tile assets
+BIOME_NAMES = ['Ocean', 'Desert', 'Scorched', 'Grassland', 'Tundra', 'Wasteland']
+TERRAIN_NAMES = ['Ocean', 'Ground', 'Hills', 'Mountain', 'Forest', 'Lakes', 'Ruins']
+
+BIOME_IDS = {name: biome_id for biome_id, name in enumerate(BIOME_NAMES)}
+TERRAIN_IDS = {name: terrain_id for terrain_id, name in enumerate(TERRAIN_NAMES)}
+
+# Marks cells that have not been given a biome yet
+UNASSIGNED = 255
+
+
+def biome_name(biome: Union[int, str]) -> str:
+    """Name for a biome id; names are passed through unchanged."""
+    if isinstance(biome, (int, np.integer)):
+        return BIOME_NAMES[biome]
+    return biome
+
+
+def terrain_name(terrain: Union[int, str]) -> str:
+    """Name for a terrain id; names are passed through unchanged."""
+    if isinstance(terrain, (int, np.integer)):
+        return TERRAIN_NAMES[terrain]
+    return terrain
+
+
+def membership_table(names, lookup) -> np.ndarray:
+    """256-entry boolean table that is True for the ids of ``names``, for indexing uint8 layers."""
+    table = np.zeros(256, dtype=bool)
+    table[[lookup[name] for name in names if name in lookup]] = True
+    return table
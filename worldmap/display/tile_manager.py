@@ -1,5 +1,7 @@
 import os
+from typing import Union
 import pygame
+from ..config.world_settings import biome_name, terrain_name
 
 class TileManager:
     def __init__(self):
@@ -107,36 +109,15 @@ class TileManager:
         for biome in self.tiles:
             print(f"Terrains for {biome}:", list(self.tiles[biome].keys()))
 
-    def get_tile(self, biome: str, terrain: str) -> pygame.Surface:
-        """Get a tile image for the given biome and terrain combination."""
-        # Map numeric or unknown biomes/terrains to their string representations
-        biome_str = str(biome)
-        terrain_str = str(terrain)
-        
-        # Handle numeric biomes
-        biome_mapping = {
-            '0': 'Ocean',
-            '1': 'Desert',
-            '2': 'Scorched',
-            '3': 'Grassland',
-            '4': 'Tundra',
-            '5': 'Wasteland'
-        }
-        
-        # Handle numeric terrains
-        terrain_mapping = {
-            '0': 'Ocean',
-            '1': 'Ground',
-            '2': 'Hills',
-            '3': 'Mountain',
-            '4': 'Forest',
-            '5': 'Lakes',
-            '6': 'Ruins'
-        }
-        
-        # Convert numeric values to string names
-        biome_str = biome_mapping.get(biome_str, biome_str)
-        terrain_str = terrain_mapping.get(terrain_str, terrain_str)
+    def get_tile(self, biome: Union[int, str], terrain: Union[int, str], variant: int = None) -> pygame.Surface:
+        """Get a tile image for the given biome and terrain combination.
+
+        When several variants exist, ``variant`` picks one deterministically;
+        otherwise one is chosen at random.
+        """
+        # Layers store Biome/Terrain ids; tiles are keyed by name
+        biome_str = biome_name(biome)
+        terrain_str = terrain_name(terrain)
         
         # Handle Ocean tiles specially
         if terrain_str == 'Ocean' or biome_str == 'Ocean':
@@ -146,6 +127,8 @@ class TileManager:
         tile = self.tiles.get(biome_str, {}).get(terrain_str)
         if tile is not None:
             if isinstance(tile, list):
+                if variant is not None:
+                    return tile[variant % len(tile)]
                 import random
                 return random.choice(tile)  # Random selection will now happen only once per position
             return tile
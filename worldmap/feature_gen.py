@@ -0,0 +1,77 @@
+import math
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+class PoissonDiskSampler:
+    """Blue-noise point placement on a cell map with a guaranteed minimum spacing.
+
+    Accepted points are kept in a background grid whose cells are
+    ``min_spacing / sqrt(2)`` wide, so each cell holds at most one point and
+    a candidate only has to be checked against the 5x5 block of cells
+    around it. Testing a candidate is O(1) however many points exist.
+
+    Several calls to ``sample`` share the same grid, so points drawn from
+    different masks (one per biome, say) keep their spacing from each other.
+    """
+
+    def __init__(self, height: int, width: int, min_spacing: float, rng: np.random.Generator):
+        self.height = height
+        self.width = width
+        self.min_spacing = float(min_spacing)
+        self.rng = rng
+        self.cell_size = max(self.min_spacing / math.sqrt(2), 1.0)
+        self.reach = math.ceil(self.min_spacing / self.cell_size)
+        self.grid = np.full((math.ceil(height / self.cell_size), math.ceil(width / self.cell_size)), -1,
+                            dtype=np.int64)
+        self.points: List[Tuple[int, int]] = []
+
+    def grid_cell(self, y: int, x: int) -> Tuple[int, int]:
+        return int(y / self.cell_size), int(x / self.cell_size)
+
+    def can_place(self, y: int, x: int) -> bool:
+        """True if (y, x) is at least ``min_spacing`` from every accepted point."""
+        gy, gx = self.grid_cell(y, x)
+        if self.grid[gy, gx] >= 0:
+            return False
+
+        min_distance_sq = self.min_spacing * self.min_spacing
+        block = self.grid[max(0, gy - self.reach):gy + self.reach + 1, max(0, gx - self.reach):gx + self.reach + 1]
+        for index in block[block >= 0]:
+            py, px = self.points[index]
+            if (py - y) ** 2 + (px - x) ** 2 < min_distance_sq:
+                return False
+        return True
+
+    def add(self, y: int, x: int):
+        """Accept (y, x) without checking it, e.g. to reserve a fixed site."""
+        self.grid[self.grid_cell(y, x)] = len(self.points)
+        self.points.append((y, x))
+
+    def sample(self, mask: np.ndarray, max_count: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Accept cells of ``mask`` in random order while they keep the spacing.
+
+        Every eligible cell is tried once, so this only stops short of
+        ``max_count`` when no eligible cell is far enough from the points
+        already placed. Returns the new points as (y, x) in acceptance order.
+        """
+        if max_count is not None and max_count <= 0:
+            return []
+
+        accepted = []
+        candidates = np.flatnonzero(mask)
+        for index in self.rng.permutation(candidates):
+            y, x = divmod(int(index), self.width)
+            if self.can_place(y, x):
+                self.add(y, x)
+                accepted.append((y, x))
+                if max_count is not None and len(accepted) >= max_count:
+                    break
+        return accepted
+
+
+def interior_mask(height: int, width: int, margin: int) -> np.ndarray:
+    """Cells at least ``margin`` cells away from every map edge."""
+    mask = np.zeros((height, width), dtype=bool)
+    mask[margin:height - margin, margin:width - margin] = True
+    return mask
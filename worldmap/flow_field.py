@@ -0,0 +1,140 @@
+from typing import Dict, Optional, Tuple
+import numpy as np
+from .pathfinding import TERRAIN_COSTS, Cell, cost_table
+from .array_utils import distinct
+
+
+class FlowField:
+    """Shared steering toward one goal cell (the player) for any number of walkers.
+
+    ``integration`` holds the cheapest cost from every cell to the goal,
+    paying terrain costs on entry as PathFinder does, and ``next_index``
+    the flat index of the neighbour to step to (-1 at the goal and where
+    it cannot be reached), so a walker's next step is one array read.
+    Values are spread from the goal in whole-array waves. Cells costing
+    more than ``max_cost`` are left unreached; by default none are.
+
+    Terrain changes that only lower costs are repaired in place. Moving
+    the goal changes nearly every value, so it rebuilds the field, as do
+    rising costs; with a ``max_cost`` a rebuild only covers the cells
+    within it.
+    """
+
+    def __init__(self, grid, terrain_costs: Dict[str, Optional[float]] = None,
+                 max_cost: Optional[float] = None):
+        self.grid = grid
+        self.terrain_costs = dict(TERRAIN_COSTS if terrain_costs is None else terrain_costs)
+        self.max_cost = np.inf if max_cost is None else max_cost
+        self.goal: Optional[Cell] = None
+        self.revision = None
+        self.delta = 1.0
+        size = grid.width * grid.height
+        # One extra slot past the end is read by the -1 entries of the neighbour table
+        self._costs = np.full(size + 1, np.inf)
+        self._integration = np.full(size + 1, np.inf)
+        self.next_index = np.full(size, -1, dtype=np.int32)
+        self.reached = np.empty(0, dtype=np.int64)  # Flat indices with a finite integration value
+        self._scratch = np.empty(size + 1, dtype=np.int64)
+
+    @property
+    def integration(self) -> np.ndarray:
+        return self._integration[:-1].reshape(self.grid.height, self.grid.width)
+
+    def update(self, goal: Cell) -> 'FlowField':
+        """Point the field at ``goal``; does nothing if neither the goal nor the grid changed."""
+        if self.goal == goal and self.revision == self.grid.revision:
+            return self
+        dropped = None
+        if self.revision != self.grid.revision:
+            costs = cost_table(self.terrain_costs)[self.grid.terrain].ravel()
+            changed = np.flatnonzero(costs != self._costs[:-1])
+            if self.goal == goal and (costs[changed] < self._costs[changed]).all():
+                dropped = changed
+            self._costs[:-1] = costs
+            passable = costs[np.isfinite(costs)]
+            self.delta = float(passable.min()) if passable.size else 1.0
+        self.revision = self.grid.revision
+
+        if dropped is not None:
+            self._repair(dropped)
+            return self
+
+        # Forget the previous field where it was set
+        previous = self.reached
+        self._integration[previous] = np.inf
+        self.next_index[previous] = -1
+
+        goal_index = goal[0] * self.grid.width + goal[1]
+        self._integration[goal_index] = 0.0
+        self.reached = self._spread(np.array([goal_index]))
+        self._aim(self.reached)
+        self.goal = goal
+        return self
+
+    def _repair(self, dropped: np.ndarray):
+        """Lower the integration after the costs of ``dropped`` cells fell, touching only what improves."""
+        table = self.grid.neighbors.table
+        integration, costs = self._integration, self._costs
+
+        # Cells that just became passable first take the best offer from around them
+        fresh = dropped[np.isinf(integration[dropped])]
+        if fresh.size:
+            around = table[fresh]
+            offers = (integration[around] + costs[around]).min(axis=1)
+            integration[fresh] = np.where(offers <= self.max_cost, offers, np.inf)
+        seeds = dropped[np.isfinite(integration[dropped])]
+        if not seeds.size:
+            return
+
+        improved = self._spread(seeds)
+        self.reached = distinct(np.concatenate([self.reached, improved]), self._scratch)
+        # Any cell next to one whose value or cost fell may have a better step now
+        around = table[improved].ravel()
+        self._aim(distinct(np.concatenate([improved, around[around >= 0]]), self._scratch))
+
+    def _spread(self, pending: np.ndarray) -> np.ndarray:
+        """Carry integration values outward from ``pending``; returns those cells and every cell improved."""
+        table = self.grid.neighbors.table
+        integration, costs = self._integration, self._costs
+        reached = [pending]
+        while pending.size:
+            # Settle the cheapest bucket of pending cells, keep the rest for later waves
+            values = integration[pending]
+            settle = values <= values.min() + self.delta
+            frontier, pending = pending[settle], pending[~settle]
+
+            # Stepping from a neighbour into a frontier cell costs the frontier cell's entry cost
+            offer = integration[frontier] + costs[frontier]
+            around = table[frontier]
+            offers = np.broadcast_to(offer[:, None], around.shape)
+            keep = (around >= 0) & (offers <= self.max_cost)
+            around, offers = around[keep], offers[keep]
+            keep = (offers < integration[around]) & np.isfinite(costs[around])
+            around, offers = around[keep], offers[keep]
+            np.minimum.at(integration, around, offers)
+
+            improved = distinct(around, self._scratch)
+            reached.append(improved)
+            pending = distinct(np.concatenate([pending, improved]), self._scratch)
+        return distinct(np.concatenate(reached), self._scratch)
+
+    def _aim(self, cells: np.ndarray):
+        """Recompute next_index for ``cells`` from their neighbours' integration values."""
+        around = self.grid.neighbors.table[cells]
+        through = self._integration[around] + self._costs[around]
+        choice = through.argmin(axis=1)
+        best = np.take_along_axis(through, choice[:, None], axis=1)[:, 0]
+        step = np.take_along_axis(around, choice[:, None], axis=1)[:, 0]
+        own = self._integration[cells]
+        self.next_index[cells] = np.where(np.isfinite(best) & np.isfinite(own) & (own > 0), step, -1)
+
+    def next_cell(self, row: int, col: int) -> Optional[Cell]:
+        """Where a walker at (row, col) should step next, or None at the goal or when cut off."""
+        step = int(self.next_index[row * self.grid.width + col])
+        return divmod(step, self.grid.width) if step >= 0 else None
+
+    def next_cells(self, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """next_cell for arrays of walkers at once; -1 for both where there is no step."""
+        step = self.next_index[np.asarray(rows) * self.grid.width + np.asarray(cols)]
+        next_rows, next_cols = np.divmod(step, self.grid.width)
+        return np.where(step >= 0, next_rows, -1), np.where(step >= 0, next_cols, -1)
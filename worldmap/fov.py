@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .config.world_settings import TERRAIN_IDS, Terrain
+
+# How much of the view behind it each terrain hides: 1 blocks, 0.5 takes two in a row to block
+TERRAIN_OPACITY = {
+    'Mountain': 1.0,
+    'Forest': 0.5
+}
+
+# Axial (dq, dr) steps around a ring, starting from the cell k steps in direction 4
+HEX_DIRECTIONS = [(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)]
+
+Cell = Tuple[int, int]
+
+
+def opacity_table(terrain_opacity: Dict[str, float]) -> np.ndarray:
+    """256-entry table of opacity by terrain id."""
+    table = np.zeros(256, dtype=np.float32)
+    for name, opacity in terrain_opacity.items():
+        table[TERRAIN_IDS[name]] = opacity
+    return table
+
+
+def hex_ring(radius: int) -> np.ndarray:
+    """Axial (dq, dr) offsets of the cells ``radius`` steps away, in order around the ring."""
+    if radius == 0:
+        return np.zeros((1, 2), dtype=np.int64)
+    cells = []
+    q, r = -radius, radius  # Direction 4 scaled by radius
+    for dq, dr in HEX_DIRECTIONS:
+        for _ in range(radius):
+            cells.append((q, r))
+            q, r = q + dq, r + dr
+    return np.array(cells, dtype=np.int64)
+
+
+class FieldOfView:
+    """Hex shadowcasting sight with explored and visible masks for fog of war.
+
+    Rings around the viewer are scanned outward. The i-th of the 6k cells
+    of ring k spans the angles ((i - 0.5) / 6k, (i + 0.5) / 6k) of a turn,
+    and a cell is seen when the shadows cast by nearer cells cover its
+    centre with less than full opacity. Each ring is one array
+    operation against the current shadow list.
+
+    A viewer on Hills sees ``hill_bonus * terrain_height`` rings further,
+    and over forest from above, where it only hides half as much.
+
+    ``visible`` and ``explored`` are bool layers of the grid, so the
+    renderer can shade straight from them. update only recomputes when the
+    viewer moves or the opacity of the cells within its sight changed.
+    """
+
+    def __init__(self, grid, radius: int = 6, hill_bonus: float = 4.0,
+                 terrain_opacity: Dict[str, float] = None):
+        self.grid = grid
+        self.radius = radius
+        self.hill_bonus = hill_bonus
+        self.opacity = opacity_table(TERRAIN_OPACITY if terrain_opacity is None else terrain_opacity)
+        self.visible = grid.add_layer('visible', bool)
+        self.explored = grid.add_layer('explored', bool)
+        self.viewer: Optional[Cell] = None
+        self.revision = None
+        self._seen = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self._window: Optional[np.ndarray] = None
+        self._rings: List[np.ndarray] = []
+
+    def reset(self):
+        """Forget everything seen, e.g. after a new world was loaded into the grid."""
+        self.visible = self.grid.add_layer('visible', bool)
+        self.explored = self.grid.add_layer('explored', bool)
+        self.viewer = None
+        self.revision = None
+        self._window = None
+        self._seen = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    def sight_radius(self, row: int, col: int) -> int:
+        if self.grid.terrain[row, col] == Terrain.HILLS:
+            return self.radius + int(round(self.hill_bonus * float(self.grid.heights[row, col])))
+        return self.radius
+
+    def update(self, viewer: Cell) -> bool:
+        """Recompute sight from ``viewer`` if needed; returns whether the masks changed."""
+        row, col = viewer
+        radius = self.sight_radius(row, col)
+        window = None
+        if self.revision != self.grid.revision or viewer != self.viewer:
+            window = self._opacity_window(row, col, radius)
+        if viewer == self.viewer:
+            if self.revision == self.grid.revision:
+                return False
+            self.revision = self.grid.revision
+            if self._window is not None and np.array_equal(window, self._window):
+                return False
+
+        rows, cols = self._cast(row, col, radius)
+        self.visible[self._seen] = False
+        self.visible[rows, cols] = True
+        self.explored[rows, cols] = True
+        self._seen = (rows, cols)
+        self.viewer = viewer
+        self.revision = self.grid.revision
+        self._window = window
+        return True
+
+    def _opacity_window(self, row: int, col: int, radius: int) -> np.ndarray:
+        """Terrain of the box of cells the viewer could see, to tell whether a change is nearby."""
+        terrain = self.grid.terrain
+        return terrain[max(0, row - radius):row + radius + 1, max(0, col - radius - 1):col + radius + 2].copy()
+
+    def ring(self, radius: int) -> np.ndarray:
+        while len(self._rings) <= radius:
+            self._rings.append(hex_ring(len(self._rings)))
+        return self._rings[radius]
+
+    def _cast(self, row: int, col: int, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows and columns of every cell visible from (row, col)."""
+        height, width = self.grid.height, self.grid.width
+        terrain = self.grid.terrain
+        from_above = terrain[row, col] == Terrain.HILLS
+        viewer_q = col - (row - (row & 1)) // 2
+
+        seen_rows, seen_cols = [np.array([row])], [np.array([col])]
+        starts = np.empty(0)
+        ends = np.empty(0)
+        strengths = np.empty(0, dtype=np.float32)
+        for distance in range(1, radius + 1):
+            offsets = self.ring(distance)
+            ring_rows = row + offsets[:, 1]
+            ring_cols = viewer_q + offsets[:, 0] + (ring_rows - (ring_rows & 1)) // 2
+            size = offsets.shape[0]
+            centres = np.arange(size) / size
+
+            # Shadow cast so far over each cell's centre
+            covered = ((starts[None, :] <= centres[:, None]) & (centres[:, None] < ends[None, :]))
+            cover = (covered * strengths[None, :]).sum(axis=1)
+            on_map = (ring_rows >= 0) & (ring_rows < height) & (ring_cols >= 0) & (ring_cols < width)
+            seen = on_map & (cover < 1.0)
+            if not seen.any():
+                break
+            seen_rows.append(ring_rows[seen])
+            seen_cols.append(ring_cols[seen])
+
+            # Seen cells that hide what is behind them add their span to the shadows
+            opacity = np.zeros(size, dtype=np.float32)
+            opacity[seen] = self.opacity[terrain[ring_rows[seen], ring_cols[seen]]]
+            if from_above:
+                opacity[opacity < 1.0] *= 0.5
+            casting = np.flatnonzero(opacity > 0)
+            if casting.size:
+                low = (casting - 0.5) / size
+                high = (casting + 0.5) / size
+                # The first cell's span wraps around past 0
+                wrapped = low < 0
+                starts = np.concatenate([starts, np.maximum(low, 0), low[wrapped] + 1])
+                ends = np.concatenate([ends, high, np.ones(np.count_nonzero(wrapped))])
+                strengths = np.concatenate([strengths, opacity[casting], opacity[casting][wrapped]])
+        return np.concatenate(seen_rows), np.concatenate(seen_cols)
@@ -1,3 +1,5 @@
 from .world_gen import WorldGenerator
+from .chunk_cache import ChunkCache
+from .instrumentation import StageStatsCollector
 
-__all__ = ['WorldGenerator']
\ No newline at end of file
+__all__ = ['WorldGenerator', 'ChunkCache', 'StageStatsCollector']
@@ -1,9 +1,17 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
 import numpy as np
+from ..config.world_settings import BIOME_IDS
+
+# Bins per climate axis of the biome lookup table
+CLIMATE_BINS = 64
+
+# Elevation below which every cell is Ocean, whatever the other ranges say
+OCEAN_ELEVATION = 0.2
+
 
 class BiomeRules:
-    def __init__(self):
+    def __init__(self, climate_bins: int = CLIMATE_BINS):
         # Define valid terrain types for each biome
         self.biome_terrain_mapping = {
             'Desert': ['Ground', 'Hills', 'Forest', 'Ruins'],
@@ -87,6 +95,20 @@ class BiomeRules:
                     'Wasteland': 0.6,
                     'Desert': 0.4
                 }
+            },
+            'Tundra': {
+                'temperature_range': (0.0, 0.25),   # Same core as WorldGenerator.biome_cores
+                'moisture_range': (0.4, 0.7),
+                'elevation_range': (0.4, 0.8),
+                'terrain_weights': {
+                    'Ground': 0.6,
+                    'Forest': 0.2,
+                    'Hills': 0.1,
+                    'Lakes': 0.1
+                },
+                'neighbor_weights': {
+                    'Tundra': 1.5
+                }
             }
         }
 
@@ -137,12 +159,17 @@ class BiomeRules:
             }
         }
 
+        # Biome lookup table over (temperature, moisture, elevation) bins, built on first use
+        self.climate_bins = climate_bins
+        self._biome_table = None
+        self._biome_table_key = None
+
     def get_possible_biomes(self, temperature: float, moisture: float, elevation: float) -> List[str]:
         """Determine possible biomes for given conditions."""
         possible_biomes = []
         
         # Special case for ocean
-        if elevation < 0.2:
+        if elevation < OCEAN_ELEVATION:
             return ['Ocean']
             
         for biome, rules in self.rules.items():
@@ -160,6 +187,63 @@ class BiomeRules:
         
         return possible_biomes if possible_biomes else ['Wasteland']
 
+    def get_biome(self, temperature: float, moisture: float, elevation: float) -> str:
+        """The biome a cell gets: the first of the possible biomes."""
+        return self.get_possible_biomes(temperature, moisture, elevation)[0]
+
+    def _range_key(self) -> Tuple:
+        return tuple((biome, tuple(rules['temperature_range']), tuple(rules['moisture_range']),
+                      tuple(rules['elevation_range'])) for biome, rules in self.rules.items())
+
+    @property
+    def biome_table(self) -> np.ndarray:
+        """uint8 biome ids indexed by (temperature, moisture, elevation) bin.
+
+        Each entry is what get_biome returns at the centre of its bin. The
+        table is rebuilt when a range in ``rules`` changes and reused
+        otherwise.
+        """
+        key = (self.climate_bins, self._range_key())
+        if key != self._biome_table_key:
+            self._biome_table = self._build_biome_table()
+            self._biome_table_key = key
+        return self._biome_table
+
+    def _build_biome_table(self) -> np.ndarray:
+        centres = (np.arange(self.climate_bins) + 0.5) / self.climate_bins
+        temperature = centres[:, None, None]
+        moisture = centres[None, :, None]
+        elevation = centres[None, None, :]
+
+        shape = (self.climate_bins,) * 3
+        table = np.full(shape, BIOME_IDS['Wasteland'], dtype=np.uint8)
+        # Paint in reverse so the first matching biome, as get_possible_biomes lists them, wins
+        for biome, rules in reversed(list(self.rules.items())):
+            if biome == 'Ocean':
+                continue
+            (t_low, t_high), (m_low, m_high), (e_low, e_high) = (
+                rules['temperature_range'], rules['moisture_range'], rules['elevation_range'])
+            inside = np.broadcast_to(((t_low <= temperature) & (temperature <= t_high)) &
+                                     ((m_low <= moisture) & (moisture <= m_high)) &
+                                     ((e_low <= elevation) & (elevation <= e_high)), shape)
+            table[inside] = BIOME_IDS[biome]
+        table[:, :, centres < OCEAN_ELEVATION] = BIOME_IDS['Ocean']
+        return table
+
+    def climate_bin(self, values: np.ndarray) -> np.ndarray:
+        """Table bin of each value; values outside [0, 1] fall in the end bins."""
+        bins = (np.asarray(values, dtype=np.float64) * self.climate_bins).astype(np.intp)
+        return np.clip(bins, 0, self.climate_bins - 1)
+
+    def classify(self, temperature: np.ndarray, moisture: np.ndarray, elevation: np.ndarray) -> np.ndarray:
+        """Biome ids for whole arrays at once, one table lookup per cell.
+
+        Matches get_biome at bin centres; a cell whose bin straddles a range
+        boundary takes the biome of the bin centre.
+        """
+        return self.biome_table[self.climate_bin(temperature), self.climate_bin(moisture),
+                                self.climate_bin(elevation)]
+
     def get_valid_terrain_types(self, biome: str) -> List[str]:
         """Get list of valid terrain types for a given biome."""
         return self.biome_terrain_mapping.get(biome, ['Ground'])
@@ -180,4 +264,14 @@ class BiomeRules:
         if not self.is_valid_terrain_for_biome(terrain, biome):
             return 0.0
         terrain_weights = self.rules.get(biome, {}).get('terrain_weights', {})
-        return terrain_weights.get(terrain, 0.1)
\ No newline at end of file
+        return terrain_weights.get(terrain, 0.1)
+
+    def neighbor_weight_matrix(self, biomes: List[str]) -> np.ndarray:
+        """get_neighbor_weight for every pair of ``biomes``, indexed [current, neighbor] by list position."""
+        return np.array([[self.get_neighbor_weight(current, neighbor) for neighbor in biomes]
+                         for current in biomes], dtype=np.float32)
+
+    def terrain_weight_matrix(self, biomes: List[str], terrains: List[str]) -> np.ndarray:
+        """get_terrain_weight for every biome and terrain, indexed [biome, terrain] by list position."""
+        return np.array([[self.get_terrain_weight(biome, terrain) for terrain in terrains]
+                         for biome in biomes])
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from .world_gen import WorldGenerator
+from .pyramid import WorldPyramid
+
+
+class ChunkCache:
+    """LRU cache of generated world chunks keyed by chunk coordinates.
+
+    Finished chunks and the cheaper base layers their neighbours need are
+    kept in separate LRU stores, so memory and generation cost follow the
+    area around the camera instead of the size of the world.
+    """
+
+    def __init__(self, generator: WorldGenerator, capacity: int = 64):
+        self.generator = generator
+        self.capacity = capacity
+        self.chunks = OrderedDict()
+        self.bases = OrderedDict()
+
+    @property
+    def chunk_size(self) -> int:
+        return self.generator.chunk_size
+
+    def get_chunk(self, cx: int, cy: int) -> Dict[str, Any]:
+        """Return chunk (cx, cy), generating it on first use."""
+        key = (cx, cy)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+
+        chunk = self.generator.generate_chunk(cx, cy, get_base=self.get_base)
+        self._remember(self.chunks, key, chunk, self.capacity)
+        return chunk
+
+    def get_base(self, cx: int, cy: int) -> Dict[str, Any]:
+        """Return the base layers of chunk (cx, cy), generating them on first use."""
+        key = (cx, cy)
+        if key in self.bases:
+            self.bases.move_to_end(key)
+            return self.bases[key]
+
+        base = self.generator.generate_chunk_base(cx, cy)
+        # Each chunk needs its 3x3 neighbourhood of bases
+        self._remember(self.bases, key, base, self.capacity * 2)
+        return base
+
+    def _remember(self, store: OrderedDict, key: Tuple[int, int], value: Dict[str, Any], capacity: int):
+        store[key] = value
+        while len(store) > capacity:
+            store.popitem(last=False)
+
+    def get_chunk_level(self, cx: int, cy: int, level: int) -> Dict[str, Any]:
+        """Layers of chunk (cx, cy) at pyramid ``level``, built the first time the chunk is viewed zoomed out.
+
+        Chunks are aligned to the chunk size, so with a power-of-two size
+        these tiles line up with the levels of a whole-world pyramid.
+        """
+        chunk = self.get_chunk(cx, cy)
+        if 'pyramid' not in chunk:
+            chunk['pyramid'] = WorldPyramid(chunk)
+        pyramid = chunk['pyramid']
+        return pyramid.get_level(min(level, pyramid.depth - 1))
+
+    def chunk_coords(self, row: int, col: int) -> Tuple[int, int, int, int]:
+        """Split a world cell into (cx, cy, row within chunk, col within chunk)."""
+        cy, local_row = divmod(row, self.chunk_size)
+        cx, local_col = divmod(col, self.chunk_size)
+        return cx, cy, local_row, local_col
+
+    def get_tile(self, row: int, col: int) -> Optional[Dict[str, Any]]:
+        """Tile data for a world cell in the same shape HexGrid.get_tile returns."""
+        cx, cy, local_row, local_col = self.chunk_coords(row, col)
+        chunk = self.get_chunk(cx, cy)
+        return {
+            'terrain': chunk['terrain_types'][local_row, local_col],
+            'biome': chunk['biomes'][local_row, local_col],
+            'height': chunk['terrain_height'][local_row, local_col]
+        }
+
+    def ensure_region(self, start_row: int, end_row: int, start_col: int, end_col: int) -> List[Tuple[int, int]]:
+        """Generate every chunk overlapping rows [start_row, end_row) and cols [start_col, end_col).
+
+        Returns the chunk coordinates that were newly generated.
+        """
+        if end_row <= start_row or end_col <= start_col:
+            return []
+
+        first_cx, first_cy, _, _ = self.chunk_coords(start_row, start_col)
+        last_cx, last_cy, _, _ = self.chunk_coords(end_row - 1, end_col - 1)
+        generated = []
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                if (cx, cy) not in self.chunks:
+                    generated.append((cx, cy))
+                self.get_chunk(cx, cy)
+        return generated
@@ -0,0 +1,146 @@
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Callable, Dict, Any, List
+
+# Shared do-nothing context returned while no hooks are registered
+NULL_STAGE = nullcontext()
+
+# hook(event, stage, info): event is 'start' or 'end'
+StageHook = Callable[[str, str, Dict[str, Any]], None]
+
+
+class StageHooks:
+    """Hooks that are told when each generation stage starts and ends.
+
+    End events carry ``wall`` and ``cpu`` seconds and, while memory
+    tracking is on, ``peak_memory``: the most bytes the stage allocated
+    on top of what was live when it started (via tracemalloc, which slows
+    allocation down, so it is opt-in). With no hooks registered ``stage``
+    returns a shared null context and costs a single check.
+    """
+
+    def __init__(self):
+        self.hooks: List[StageHook] = []
+        self.track_memory = False
+        self.context: Dict[str, Any] = {}
+        self._active: List['_Stage'] = []
+
+    def add(self, hook: StageHook, track_memory: bool = False):
+        self.hooks.append(hook)
+        self.track_memory = self.track_memory or track_memory
+
+    def remove(self, hook: StageHook):
+        self.hooks.remove(hook)
+        if not self.hooks:
+            self.track_memory = False
+
+    def stage(self, name: str):
+        if not self.hooks:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    def emit(self, event: str, name: str, info: Dict[str, Any]):
+        for hook in list(self.hooks):
+            hook(event, name, info)
+
+
+class _Stage:
+    """Measures one stage; nested stages report their own share of the peak."""
+
+    def __init__(self, hooks: StageHooks, name: str):
+        self.hooks = hooks
+        self.name = name
+        self.peak = 0
+        self.base_memory = None
+        self.started_tracing = False
+
+    def __enter__(self):
+        hooks = self.hooks
+        if hooks.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            # Hand the peak so far to the enclosing stages before restarting it
+            current, peak = tracemalloc.get_traced_memory()
+            for parent in hooks._active:
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.base_memory = current
+        hooks._active.append(self)
+
+        info = dict(hooks.context, depth=len(hooks._active) - 1)
+        hooks.emit('start', self.name, info)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        hooks = self.hooks
+        hooks._active.pop()
+
+        info = dict(hooks.context, depth=len(hooks._active), wall=wall, cpu=cpu, failed=exc_type is not None)
+        if self.base_memory is not None and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            for parent in hooks._active:
+                parent.peak = max(parent.peak, self.peak)
+            info['peak_memory'] = max(0, self.peak - self.base_memory)
+            if self.started_tracing:
+                tracemalloc.stop()
+        hooks.emit('end', self.name, info)
+        return False
+
+
+class StageStatsCollector:
+    """Stage hook that aggregates end events over any number of runs.
+
+    Register it with ``WorldGenerator.add_stage_hook(collector)`` on as many
+    generators as needed, then read ``summary()`` or print ``report()``.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.keep_events = False
+
+    def __call__(self, event: str, stage: str, info: Dict[str, Any]):
+        if event != 'end':
+            return
+        if self.keep_events:
+            self.events.append(dict(info, stage=stage))
+
+        stats = self.stats.get(stage)
+        if stats is None:
+            stats = self.stats[stage] = {
+                'count': 0, 'wall_total': 0.0, 'wall_min': float('inf'), 'wall_max': 0.0,
+                'cpu_total': 0.0, 'peak_memory_max': 0
+            }
+        stats['count'] += 1
+        stats['wall_total'] += info['wall']
+        stats['wall_min'] = min(stats['wall_min'], info['wall'])
+        stats['wall_max'] = max(stats['wall_max'], info['wall'])
+        stats['cpu_total'] += info['cpu']
+        stats['peak_memory_max'] = max(stats['peak_memory_max'], info.get('peak_memory', 0))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage totals plus mean wall and CPU time, in the order stages first finished."""
+        summary = {}
+        for stage, stats in self.stats.items():
+            summary[stage] = dict(stats,
+                                  wall_mean=stats['wall_total'] / stats['count'],
+                                  cpu_mean=stats['cpu_total'] / stats['count'])
+        return summary
+
+    def report(self) -> str:
+        lines = [f"{'stage':<20} {'runs':>5} {'wall mean':>10} {'wall max':>10} {'cpu mean':>10} {'peak MB':>9}"]
+        for stage, stats in self.summary().items():
+            lines.append(f"{stage:<20} {stats['count']:>5} {stats['wall_mean']:>10.4f} {stats['wall_max']:>10.4f} "
+                         f"{stats['cpu_mean']:>10.4f} {stats['peak_memory_max'] / 2 ** 20:>9.1f}")
+        return '\n'.join(lines)
+
+    def reset(self):
+        self.stats = {}
+        self.events = []
@@ -0,0 +1,160 @@
+from opensimplex import OpenSimplex
+from opensimplex.constants import STRETCH_CONSTANT2, SQUISH_CONSTANT2, NORM_CONSTANT2
+import numpy as np
+
+# Gradients for 2D, same table and layout as opensimplex uses
+GRADIENTS2 = np.array([
+    5, 2, 2, 5,
+    -5, 2, -2, 5,
+    5, -2, 2, -5,
+    -5, -2, -2, -5,
+], dtype=np.int64)
+
+
+class SimplexNoise:
+    """Batched 2D OpenSimplex noise evaluated over whole coordinate grids.
+
+    Uses the same permutation table as ``opensimplex.OpenSimplex`` and repeats
+    its floating point operations in the same order, so every cell matches
+    ``OpenSimplex(seed).noise2(x, y)`` bit for bit.
+    """
+
+    # Rows are evaluated in blocks so temporaries stay around this many cells
+    BLOCK_CELLS = 1 << 20
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.scalar = OpenSimplex(seed=seed)
+        self.perm = self.scalar._perm
+
+    def noise2(self, x: float, y: float) -> float:
+        """Single point lookup, kept for callers that only need one value."""
+        return self.scalar.noise2(x, y)
+
+    def noise2_grid(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Evaluate noise for every (x, y) pair, returning shape (len(ys), len(xs))."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        out = np.empty((ys.size, xs.size))
+        rows_per_block = max(1, self.BLOCK_CELLS // max(1, xs.size))
+
+        for start in range(0, ys.size, rows_per_block):
+            stop = min(ys.size, start + rows_per_block)
+            x, y = np.broadcast_arrays(xs[None, :], ys[start:stop, None])
+            out[start:stop] = self._noise2(x, y)
+        return out
+
+    def fractal(self, x0: int, y0: int, width: int, height: int, scale: float, octaves: int,
+                persistence: float = 0.5, frequency: float = 2.0) -> np.ndarray:
+        """Sum noise octaves over a window of world cells, divided by the total amplitude."""
+        world = np.zeros((height, width))
+        max_amplitude = 0.0
+        amplitude = 1.0
+        xs = np.arange(x0, x0 + width, dtype=np.float64)
+        ys = np.arange(y0, y0 + height, dtype=np.float64)
+        
+        for octave in range(octaves):
+            freq = frequency ** octave
+            max_amplitude += amplitude
+            
+            # Evaluate the whole octave at once instead of one noise2 call per cell
+            world += self.noise2_grid(
+                xs * freq / scale,
+                ys * freq / scale
+            ) * amplitude
+            
+            amplitude *= persistence  # Move inside the octave loop
+        
+        # Normalize considering total amplitude
+        world /= max_amplitude
+        
+        return world
+
+    def _extrapolate(self, xsb: np.ndarray, ysb: np.ndarray,
+                     dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+        perm = self.perm
+        index = perm[(perm[xsb & 0xFF] + ysb) & 0xFF] & 0x0E
+        return GRADIENTS2[index] * dx + GRADIENTS2[index + 1] * dy
+
+    def _contribution(self, value, xsb, ysb, dx, dy):
+        attn = 2 - dx * dx - dy * dy
+        live = attn > 0
+        attn = attn * attn
+        return np.where(live, value + attn * attn * self._extrapolate(xsb, ysb, dx, dy), value)
+
+    def _noise2(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        # Place input coordinates onto grid
+        stretch_offset = (x + y) * STRETCH_CONSTANT2
+        xs = x + stretch_offset
+        ys = y + stretch_offset
+
+        # Floor to get grid coordinates of rhombus super-cell origin
+        xsb_f = np.floor(xs)
+        ysb_f = np.floor(ys)
+        xsb = xsb_f.astype(np.int64)
+        ysb = ysb_f.astype(np.int64)
+
+        # Skew out to get actual coordinates of rhombus origin
+        squish_offset = (xsb_f + ysb_f) * SQUISH_CONSTANT2
+        xb = xsb_f + squish_offset
+        yb = ysb_f + squish_offset
+
+        # Grid coordinates relative to rhombus origin, and which region we're in
+        xins = xs - xsb_f
+        yins = ys - ysb_f
+        in_sum = xins + yins
+
+        # Positions relative to origin point
+        dx0 = x - xb
+        dy0 = y - yb
+
+        value = np.zeros_like(x)
+
+        # Contribution (1,0)
+        dx1 = dx0 - 1 - SQUISH_CONSTANT2
+        dy1 = dy0 - 0 - SQUISH_CONSTANT2
+        value = self._contribution(value, xsb + 1, ysb + 0, dx1, dy1)
+
+        # Contribution (0,1)
+        dx2 = dx0 - 0 - SQUISH_CONSTANT2
+        dy2 = dy0 - 1 - SQUISH_CONSTANT2
+        value = self._contribution(value, xsb + 0, ysb + 1, dx2, dy2)
+
+        # Pick the extra vertex for each cell, following the scalar branches
+        lower = in_sum <= 1
+        x_gt_y = xins > yins
+        zins_lo = 1 - in_sum
+        zins_hi = 2 - in_sum
+        near_lo = (zins_lo > xins) | (zins_lo > yins)
+        near_hi = (zins_hi < xins) | (zins_hi < yins)
+
+        lo_a = lower & near_lo & x_gt_y
+        lo_b = lower & near_lo & ~x_gt_y
+        lo_c = lower & ~near_lo
+        hi_a = ~lower & near_hi & x_gt_y
+        hi_b = ~lower & near_hi & ~x_gt_y
+
+        xsv_ext = np.select([lo_a, lo_b, lo_c, hi_a, hi_b],
+                            [xsb + 1, xsb - 1, xsb + 1, xsb + 2, xsb + 0], xsb)
+        ysv_ext = np.select([lo_a, lo_b, lo_c, hi_a, hi_b],
+                            [ysb - 1, ysb + 1, ysb + 1, ysb + 0, ysb + 2], ysb)
+        dx_ext = np.select([lo_a, lo_b, lo_c, hi_a, hi_b],
+                           [dx0 - 1, dx0 + 1, dx0 - 1 - 2 * SQUISH_CONSTANT2,
+                            dx0 - 2 - 2 * SQUISH_CONSTANT2, dx0 + 0 - 2 * SQUISH_CONSTANT2], dx0)
+        dy_ext = np.select([lo_a, lo_b, lo_c, hi_a, hi_b],
+                           [dy0 + 1, dy0 - 1, dy0 - 1 - 2 * SQUISH_CONSTANT2,
+                            dy0 + 0 - 2 * SQUISH_CONSTANT2, dy0 - 2 - 2 * SQUISH_CONSTANT2], dy0)
+
+        # Inside the (1,1) triangle the origin vertex moves to (1,1)
+        xsb = np.where(lower, xsb, xsb + 1)
+        ysb = np.where(lower, ysb, ysb + 1)
+        dx0 = np.where(lower, dx0, dx0 - 1 - 2 * SQUISH_CONSTANT2)
+        dy0 = np.where(lower, dy0, dy0 - 1 - 2 * SQUISH_CONSTANT2)
+
+        # Contribution (0,0) or (1,1)
+        value = self._contribution(value, xsb, ysb, dx0, dy0)
+
+        # Extra vertex
+        value = self._contribution(value, xsv_ext, ysv_ext, dx_ext, dy_ext)
+
+        return value / NORM_CONSTANT2
@@ -0,0 +1,65 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+from .world_gen import WorldGenerator
+
+
+def build_world(width: int, height: int, seed: int, cache_dir: Optional[str] = None,
+                cache_size: Optional[int] = None) -> Tuple[WorldGenerator, Dict[str, Any]]:
+    """Create a generator for ``seed`` and generate its full world map, reusing ``cache_dir`` if given."""
+    generator = WorldGenerator(width=width, height=height, seed=seed)
+    if cache_dir:
+        return generator, generator.cached_world_map(cache_dir, keep=cache_size)
+    return generator, generator.generate_world_map()
+
+
+class WorldPregenerator:
+    """Generates worlds in the background so the game never waits on them.
+
+    One world is queued for the next game and one spare is generated
+    speculatively, so regenerating can swap to it immediately. Worlds are
+    built on a worker thread rather than a process: a spawned process
+    would re-import main.py and open a second window, and generation is
+    dominated by NumPy array work.
+    """
+
+    def __init__(self, width: int, height: int, spares: int = 1, seed: Optional[int] = None,
+                 cache_dir: Optional[str] = None, cache_size: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.spares = spares
+        self.seed = seed  # Every world uses this seed if set
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='worldgen')
+        self.pending = []
+
+    def start(self):
+        """Queue worlds until one is on its way plus the speculative spares."""
+        while len(self.pending) < 1 + self.spares:
+            seed = self.seed if self.seed is not None else np.random.randint(0, 99999)
+            self.pending.append(self.executor.submit(
+                build_world, self.width, self.height, seed, self.cache_dir, self.cache_size
+            ))
+
+    @property
+    def next_world(self) -> Future:
+        self.start()
+        return self.pending[0]
+
+    def ready(self) -> bool:
+        """True if the next world can be taken without waiting."""
+        return self.next_world.done()
+
+    def take(self) -> Tuple[WorldGenerator, Dict[str, Any]]:
+        """Hand over the next world, waiting for it if needed, and queue a replacement."""
+        future = self.next_world
+        self.pending.pop(0)
+        self.start()
+        return future.result()
+
+    def shutdown(self):
+        for future in self.pending:
+            future.cancel()
+        self.pending = []
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,119 @@
+import math
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from ..config.world_settings import BIOME_NAMES, TERRAIN_NAMES
+
+# Layers averaged when downsampling
+CONTINUOUS_LAYERS = ['terrain_height', 'temperature', 'moisture']
+
+# Layers downsampled by majority vote, with their number of ids
+CATEGORICAL_LAYERS = {
+    'biomes': len(BIOME_NAMES),
+    'terrain_types': len(TERRAIN_NAMES)
+}
+
+
+def _block_counts(size: int) -> np.ndarray:
+    """Cells per 2-cell block along one axis; the last block is short when ``size`` is odd."""
+    counts = np.full((size + 1) // 2, 2)
+    if size % 2:
+        counts[-1] = 1
+    return counts
+
+
+def downsample_mean(layer: np.ndarray) -> np.ndarray:
+    """Halve a layer by averaging 2x2 blocks; blocks cut by an odd edge average the cells they have."""
+    height, width = layer.shape
+    half_height, half_width = (height + 1) // 2, (width + 1) // 2
+    if height % 2 or width % 2:
+        padded = np.zeros((half_height * 2, half_width * 2), dtype=layer.dtype)
+        padded[:height, :width] = layer
+        layer = padded
+    sums = layer.reshape(half_height, 2, half_width, 2).sum(axis=(1, 3))
+    cells = _block_counts(height)[:, None] * _block_counts(width)[None, :]
+    return (sums / cells).astype(layer.dtype, copy=False)
+
+
+def downsample_majority(layer: np.ndarray, classes: int) -> np.ndarray:
+    """Halve a categorical layer by taking the most common id of each 2x2 block.
+
+    Ties go to the lowest id. Counting is one bincount over block and id,
+    so the cost is linear in the number of cells.
+    """
+    height, width = layer.shape
+    half_height, half_width = (height + 1) // 2, (width + 1) // 2
+    # Cells past an odd edge get an extra id that never wins
+    padded = np.full((half_height * 2, half_width * 2), classes, dtype=np.int64)
+    padded[:height, :width] = layer
+
+    blocks = padded.reshape(half_height, 2, half_width, 2).transpose(0, 2, 1, 3).reshape(-1, 4)
+    block_index = np.arange(blocks.shape[0])[:, None]
+    counts = np.bincount((block_index * (classes + 1) + blocks).ravel(),
+                         minlength=blocks.shape[0] * (classes + 1))
+    counts = counts.reshape(-1, classes + 1)[:, :classes]
+    return counts.argmax(axis=1).astype(layer.dtype).reshape(half_height, half_width)
+
+
+def downsample(name: str, layer: np.ndarray) -> np.ndarray:
+    if name in CATEGORICAL_LAYERS:
+        return downsample_majority(layer, CATEGORICAL_LAYERS[name])
+    return downsample_mean(layer)
+
+
+class WorldPyramid:
+    """Mip-style pyramid of world layers at full, 1/2, 1/4, ... resolution.
+
+    Level 0 is the world data itself, not a copy. Each further level is
+    built from the one below it: continuous layers by mean, biomes and
+    terrain by majority vote. Cell (row, col) of level k covers rows
+    [row * 2**k, (row + 1) * 2**k) of the full map, and columns likewise.
+    """
+
+    def __init__(self, world_data: Dict[str, Any], min_size: int = 1):
+        self.layers = [name for name in CONTINUOUS_LAYERS + list(CATEGORICAL_LAYERS) if name in world_data]
+        base = {name: world_data[name] for name in self.layers}
+        self.levels: List[Dict[str, np.ndarray]] = [base]
+
+        height, width = base[self.layers[0]].shape
+        while max(height, width) > min_size:
+            base = {name: downsample(name, layer) for name, layer in base.items()}
+            height, width = base[self.layers[0]].shape
+            self.levels.append(base)
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels)
+
+    def level_for_zoom(self, zoom: float) -> int:
+        """Coarsest level whose cells are still at least one tile across at ``zoom``.
+
+        ``zoom`` is the drawn size of a full-resolution cell relative to a
+        normal tile: 1 draws level 0, 0.5 draws level 1, 0.1 draws level 3.
+        """
+        if zoom >= 1:
+            return 0
+        return min(self.depth - 1, int(math.floor(math.log2(1 / zoom))))
+
+    def get_level(self, level: int) -> Dict[str, np.ndarray]:
+        return self.levels[level]
+
+    def query(self, zoom: float) -> Tuple[int, Dict[str, np.ndarray]]:
+        """The level for ``zoom`` and its layers."""
+        level = self.level_for_zoom(zoom)
+        return level, self.levels[level]
+
+    def update_region(self, start_row: int, end_row: int, start_col: int, end_col: int):
+        """Rebuild the coarser levels over rows [start_row, end_row) and cols [start_col, end_col).
+
+        Call this after writing into the level 0 arrays, e.g. once a chunk
+        has been regenerated; only the blocks covering the region are
+        recomputed at each level.
+        """
+        for level in range(1, self.depth):
+            # Expand to whole blocks of the level below
+            start_row, start_col = start_row // 2, start_col // 2
+            end_row, end_col = (end_row + 1) // 2, (end_col + 1) // 2
+            below = self.levels[level - 1]
+            for name, layer in self.levels[level].items():
+                window = below[name][start_row * 2:end_row * 2, start_col * 2:end_col * 2]
+                layer[start_row:end_row, start_col:end_col] = downsample(name, window)
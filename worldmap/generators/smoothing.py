@@ -0,0 +1,47 @@
+from typing import Sequence
+import numpy as np
+from ..hex_neighbors import HexNeighbors
+
+def smooth_labels(labels: np.ndarray, weights: np.ndarray, iterations: int,
+                  fixed: Sequence[int] = (), neighbors: HexNeighbors = None) -> np.ndarray:
+    """Cellular-automaton smoothing of a label map such as the biome layer.
+
+    Each iteration scores every label for every cell as the sum over the
+    cell and its six hex neighbours of ``weights[label, their label]``, and
+    moves the cell to the best scoring label if that beats its current one.
+    Only labels the cell or a neighbour already has are candidates, so
+    nothing new is invented, and ties keep the cell as it is. Labels in
+    ``fixed`` neither change nor spread.
+
+    Counting the cell itself keeps straight and gently curved borders in
+    place, so isolated cells and ragged edges are absorbed within a few
+    iterations and the map then stops changing. Every step is a whole-map
+    array operation, and the loop stops early once an iteration changes
+    nothing.
+    """
+    labels = labels.copy()
+    neighbors = neighbors or HexNeighbors(*labels.shape)
+    classes = weights.shape[0]
+    movable = ~np.isin(labels, fixed)
+    candidates = [label for label in range(classes) if label not in fixed]
+
+    for _ in range(iterations):
+        counts = neighbors.counts(labels, classes)
+        counts += labels == np.arange(classes, dtype=labels.dtype)[:, None, None]
+        best = labels.copy()
+        best_score = np.full(labels.shape, -np.inf, dtype=np.float32)
+        current_score = np.zeros(labels.shape, dtype=np.float32)
+
+        for label in candidates:
+            score = np.tensordot(weights[label], counts, axes=1).astype(np.float32, copy=False)
+            is_current = labels == label
+            current_score[is_current] = score[is_current]
+            better = ((counts[label] > 0) | is_current) & (score > best_score)
+            best_score[better] = score[better]
+            best[better] = label
+
+        changed = movable & (best_score > current_score)
+        if not changed.any():
+            break
+        labels[changed] = best[changed]
+    return labels
@@ -0,0 +1,112 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Sequence
+import numpy as np
+
+
+def params_key(params: Any) -> str:
+    """Stable hash of a stage's parameters; tuples and lists hash the same."""
+    encoded = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def freeze(value: Any) -> Any:
+    """Make the arrays in a stage output read-only so memoized results cannot be edited in place."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            freeze(item)
+    return value
+
+
+class Stage:
+    """One named step of the graph.
+
+    ``func`` is called with the outputs of ``inputs`` in order. ``params``
+    is called before every run and returns the settings the stage reads, so
+    edits to the generator's tables are picked up without rebuilding the
+    graph.
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = (),
+                 params: Callable[[], Any] = lambda: None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params
+
+
+class StageGraph:
+    """Memoized dependency graph of generation stages.
+
+    A stage's key is the hash of its parameters together with the keys of
+    its inputs, so a key changes exactly when something upstream of the
+    stage, or the stage itself, changed. Outputs are remembered by key and
+    frozen, and a run only calls the stages whose key is not remembered.
+    """
+
+    def __init__(self, stages: Sequence[Stage], entries_per_stage: int = 2, run_stage=None):
+        self.stages = OrderedDict()
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on {missing}, which must be added before it")
+            self.stages[stage.name] = stage
+        self.entries_per_stage = entries_per_stage
+        # Wraps each stage call, e.g. to time it; receives the stage name and a zero-argument call
+        self.run_stage = run_stage or (lambda name, call: call())
+        self.memo: Dict[str, OrderedDict] = {name: OrderedDict() for name in self.stages}
+        self.last_run: List[str] = []
+
+    def run(self, targets: Sequence[str] = None) -> Dict[str, Any]:
+        """Outputs of ``targets`` (default: every stage), rerunning only stale stages.
+
+        The names of the stages that actually ran are left in ``last_run``.
+        """
+        needed = self._upstream(targets or list(self.stages))
+        keys = {}
+        outputs = {}
+        self.last_run = []
+
+        # Stages are stored in dependency order
+        for name, stage in self.stages.items():
+            if name not in needed:
+                continue
+            key = params_key([name, stage.params(), [keys[source] for source in stage.inputs]])
+            keys[name] = key
+
+            memo = self.memo[name]
+            if key in memo:
+                memo.move_to_end(key)
+                outputs[name] = memo[key]
+                continue
+
+            args = [outputs[source] for source in stage.inputs]
+            outputs[name] = freeze(self.run_stage(name, lambda: stage.func(*args)))
+            self.last_run.append(name)
+            memo[key] = outputs[name]
+            while len(memo) > self.entries_per_stage:
+                memo.popitem(last=False)
+
+        return {name: outputs[name] for name in (targets or self.stages)}
+
+    def _upstream(self, targets: Sequence[str]) -> set:
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].inputs)
+        return needed
+
+    def clear(self):
+        for memo in self.memo.values():
+            memo.clear()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import struct
+from typing import Dict, Any, Optional
+import numpy as np
+
+# Bump whenever the file layout or the generator output changes for the same parameters
+CACHE_VERSION = 7
+
+MAGIC = b'WMAP'
+# Magic, format version and header length in bytes
+PREAMBLE = struct.Struct('<4sII')
+# Arrays start on this boundary so they can be memory-mapped directly
+ALIGNMENT = 64
+
+# Layers of world_data that are stored, in file order
+WORLD_LAYERS = ['terrain_height', 'temperature', 'moisture', 'biomes', 'terrain_types', 'rivers', 'lakes']
+
+
+def params_fingerprint(params: Dict[str, Any]) -> str:
+    """Stable hash of the generation parameters, used to key and validate cache files."""
+    encoded = json.dumps({'version': CACHE_VERSION, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def cache_path(cache_dir: str, seed: int, width: int, height: int, fingerprint: str) -> str:
+    """File a world is stored under; seed and size stay readable, the rest is in the hash."""
+    return os.path.join(cache_dir, f'world_{seed}_{width}x{height}_{fingerprint[:16]}.wmap')
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_world(path: str, world_data: Dict[str, Any], fingerprint: str):
+    """Write the world layers as one versioned file of raw, aligned arrays.
+
+    The file is written next to its destination and moved into place, so a
+    reader never sees a half-written world.
+    """
+    layers = [np.ascontiguousarray(world_data[name]) for name in WORLD_LAYERS]
+
+    # Offsets depend on the header length, so lay the arrays out relative to the data start
+    entries = []
+    offset = 0
+    for name, layer in zip(WORLD_LAYERS, layers):
+        offset = _aligned(offset)
+        entries.append({'name': name, 'dtype': layer.dtype.str, 'shape': list(layer.shape), 'offset': offset})
+        offset += layer.nbytes
+    header = json.dumps({'fingerprint': fingerprint, 'arrays': entries}).encode('utf-8')
+    data_start = _aligned(PREAMBLE.size + len(header))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, CACHE_VERSION, len(header)))
+        f.write(header)
+        for entry, layer in zip(entries, layers):
+            f.seek(data_start + entry['offset'])
+            f.write(layer.tobytes())
+    os.replace(temp_path, path)
+
+
+def load_world(path: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Memory-map a cached world, or return None if it is missing, unreadable or stale.
+
+    Arrays are mapped copy-on-write: callers may modify them without
+    touching the file.
+    """
+    try:
+        with open(path, 'rb') as f:
+            magic, version, header_size = PREAMBLE.unpack(f.read(PREAMBLE.size))
+            if magic != MAGIC or version != CACHE_VERSION:
+                return None
+            header = json.loads(f.read(header_size))
+    except (OSError, struct.error, ValueError):
+        return None
+
+    if header.get('fingerprint') != fingerprint:
+        return None
+
+    data_start = _aligned(PREAMBLE.size + header_size)
+    file_size = os.path.getsize(path)
+    world_data = {}
+    for entry in header['arrays']:
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        offset = data_start + entry['offset']
+        if offset + dtype.itemsize * int(np.prod(shape)) > file_size:
+            return None
+        world_data[entry['name']] = np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=shape)
+
+    if any(name not in world_data for name in WORLD_LAYERS):
+        return None
+    return world_data
+
+
+def remove_stale(cache_dir: str, seed: int, width: int, height: int, fingerprint: str):
+    """Delete cached files for this seed and size that were made with other parameters."""
+    if not os.path.isdir(cache_dir):
+        return
+    current = os.path.basename(cache_path(cache_dir, seed, width, height, fingerprint))
+    prefix = f'world_{seed}_{width}x{height}_'
+    for filename in os.listdir(cache_dir):
+        if filename.startswith(prefix) and filename.endswith('.wmap') and filename != current:
+            try:
+                os.remove(os.path.join(cache_dir, filename))
+            except OSError:
+                pass
+
+
+def prune(cache_dir: str, keep: int):
+    """Keep only the ``keep`` most recently used worlds in ``cache_dir``."""
+    if not os.path.isdir(cache_dir):
+        return
+    paths = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith('.wmap')]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,36 +1,147 @@
-from opensimplex import OpenSimplex
+import os
 import numpy as np
 from typing import Dict, Any, List, Tuple
 from .biome_rules import BiomeRules
+from .noise import SimplexNoise
+from . import world_cache
+from .instrumentation import StageHooks, StageHook
+from .stage_graph import Stage, StageGraph
+from .pyramid import WorldPyramid
+from .hydrology import drainage, near
+from .smoothing import smooth_labels
+from ..feature_gen import PoissonDiskSampler, interior_mask
+from ..hex_neighbors import HexNeighbors
+from ..array_utils import distinct
+from ..config.world_settings import (
+    Biome, Terrain, BIOME_NAMES, BIOME_IDS, TERRAIN_IDS, UNASSIGNED, membership_table
+)
+
+# Terrain features placed after oceans and ruins, in priority order
+TERRAIN_FEATURES = ['Mountain', 'Forest', 'Hills', 'Lakes']
+
+# Independent random streams, one per generation stage
+RNG_STREAMS = {
+    'biome_ruins': 1,
+    'terrain_ruins': 2,
+    'terrain_features': 3
+}
+
+# Rows per band when per-cell random draws are split up
+RNG_BAND_ROWS = 64
+
+# Average land area per ruin when ruins are placed chunk by chunk
+CELLS_PER_RUIN = 1600
+
+# Maps each biome_cores condition to the field it tests and how it tests it
+BIOME_CONDITIONS = {
+    'temp_min': ('temperature', 'min'),
+    'temp_max': ('temperature', 'max'),
+    'temp_range': ('temperature', 'range'),
+    'moist_max': ('moisture', 'max'),
+    'moist_range': ('moisture', 'range'),
+    'elev_range': ('elevation', 'range'),
+    'y_max': ('row', 'max')
+}
+
+
+def compile_biome_cores(biome_cores: Dict[str, Dict[str, Any]]) -> List[Tuple[str, List[Tuple[str, Any, Any]]]]:
+    """Turn the biome_cores table into (biome, [(field, compare, bound), ...]) predicates.
+
+    Biomes come back as ids. Ocean is skipped because it is placed by its
+    own strict elevation cut. All other bounds are inclusive, matching the
+    per-cell checks they replace.
+    """
+    predicates = []
+    for biome, conditions in biome_cores.items():
+        if biome == 'Ocean':
+            continue
+        
+        clauses = []
+        for key, bound in conditions.items():
+            field, kind = BIOME_CONDITIONS[key]
+            if kind == 'min':
+                clauses.append((field, np.greater_equal, bound))
+            elif kind == 'max':
+                clauses.append((field, np.less_equal, bound))
+            else:
+                clauses.append((field, np.greater_equal, bound[0]))
+                clauses.append((field, np.less_equal, bound[1]))
+        predicates.append((BIOME_IDS[biome], clauses))
+    return predicates
+
+
+def stage_rng(seed: int, stream: str, *keys: int) -> np.random.Generator:
+    """Generator for ``stream`` derived from the world seed and any chunk/band keys."""
+    entropy = [key & 0xFFFFFFFFFFFFFFFF for key in (seed, RNG_STREAMS[stream]) + keys]
+    return np.random.default_rng(entropy)
+
+
+def fractal_noise_band(seed: int, x0: int, y0: int, width: int, height: int,
+                       params: Dict[str, Any]) -> np.ndarray:
+    """Raw fractal noise for one window; module level so process pools can run it."""
+    return SimplexNoise(seed).fractal(x0, y0, width, height, **params)
+
+
+def feature_rolls_band(seed: int, band: int, height: int, width: int, features: int) -> np.ndarray:
+    """Per-feature terrain rolls for one row band of the full map."""
+    return stage_rng(seed, 'terrain_features', band).random((features, height, width), dtype=np.float32)
+
+
+def run_tasks(executor, func, arg_lists: List[Tuple]) -> List[Any]:
+    """Run func over argument tuples, in order, on the executor if one is given."""
+    if executor is None:
+        return [func(*args) for args in arg_lists]
+    return list(executor.map(func, *zip(*arg_lists)))
+
 
 class WorldGenerator:
-    def __init__(self, width: int, height: int, seed: int = None):
+    def __init__(self, width: int, height: int, seed: int = None, chunk_size: int = 32):
         self.width = width
         self.height = height
         self.seed = seed if seed is not None else np.random.randint(0, 99999)
-        self.noise_gen = OpenSimplex(seed=self.seed)
+        self.noise_gen = SimplexNoise(seed=self.seed)
         self.biome_rules = BiomeRules()
-
-    def get_neighbors(self, y: int, x: int, grid: np.ndarray) -> List[Tuple[int, int, Any]]:
-        """Get valid neighboring cells with their coordinates."""
-        neighbors = []
-        for dy in [-1, 0, 1]:
-            for dx in [-1, 0, 1]:
-                if dy == 0 and dx == 0:
-                    continue
-                ny, nx = y + dy, x + dx
-                if 0 <= ny < self.height and 0 <= nx < self.width:
-                    # Handle both numpy arrays and object arrays
-                    value = grid[ny][nx] if isinstance(grid[ny][nx], (str, type(None))) else grid[ny][nx].item()
-                    neighbors.append((ny, nx, value))
-        return neighbors
-
-    def generate_biome_map(self, elevation: np.ndarray, temperature: np.ndarray, moisture: np.ndarray) -> np.ndarray:
-        """Generate improved biome map ensuring all biomes are present."""
-        biome_map = np.full((self.height, self.width), '', dtype=object)
+        self.stage_hooks = StageHooks()
+        self.stage_hooks.context = {'seed': self.seed, 'width': width, 'height': height}
+        
+        # Noise layers and their scales
+        self.noise_fields = {
+            'elevation': {'scale': 75.0, 'octaves': 5},
+            'temperature': {'scale': 100.0, 'octaves': 4},
+            'moisture': {'scale': 85.0, 'octaves': 4}
+        }
+        
+        # Climate transforms applied to the normalized noise, see apply_climate
+        self.climate = {
+            'temperature_gradient': 0.7,  # Weight of latitude in temperature
+            'temperature_noise': 0.3,     # Weight of noise in temperature
+            'temperature_scale': 1.2,
+            'temperature_shift': 0.1,
+            'moisture_scale': 1.3,
+            'moisture_shift': 0.15,
+            'elevation_scale': 1.2
+        }
+        
+        # Drainage over the elevation field, see generate_hydrology
+        self.hydrology = {
+            'enabled': True,
+            'sea_level': 0.15,       # Water drains into cells below this, same cut as terrain Ocean
+            'river_min_area': 100,   # Cells that must drain through a cell to make it a river
+            'lake_min_depth': 0.03,  # How deep a filled depression must be to count as lake
+            'wetness': 0.2           # Moisture added on and next to rivers and lakes
+        }
+        
+        # Cellular-automaton passes over the finished biome map, see smooth_biomes
+        self.biome_smoothing = {'iterations': 4}
+        
+        # Chunked generation: height still sets the latitude span for temperature,
+        # raw noise is mapped from this fixed range since chunks have no global min/max
+        self.chunk_size = chunk_size
+        self.chunk_noise_range = (-0.5, 0.5)
+        self.chunk_cluster_waves = 4
         
         # Define core regions for each biome type with more distinct boundaries
-        biome_cores = {
+        self.biome_cores = {
             'Desert': {
                 'temp_min': 0.7,
                 'moist_max': 0.3,
@@ -51,287 +162,800 @@ class WorldGenerator:
                 'elev_max': 0.2
             }
         }
-        
-        # First pass: Place Ocean
-        for y in range(self.height):
-            for x in range(self.width):
-                if elevation[y, x] < biome_cores['Ocean']['elev_max']:
-                    biome_map[y, x] = 'Ocean'
-                    continue
-        
-        # Second pass: Place core biomes with stricter rules
-        for biome, conditions in biome_cores.items():
-            if biome == 'Ocean':
-                continue
-                
-            for y in range(self.height):
-                # Skip if outside of y_max for Tundra
-                if biome == 'Tundra' and y > conditions['y_max']:
-                    continue
-                    
-                for x in range(self.width):
-                    if biome_map[y, x]:  # Skip if already assigned
-                        continue
-                    
-                    # Check conditions for each biome with more precise ranges
-                    matches = True
-                    if 'temp_min' in conditions and temperature[y, x] < conditions['temp_min']:
-                        matches = False
-                    if 'temp_max' in conditions and temperature[y, x] > conditions['temp_max']:
-                        matches = False
-                    if 'temp_range' in conditions and not (conditions['temp_range'][0] <= temperature[y, x] <= conditions['temp_range'][1]):
-                        matches = False
-                    if 'moist_range' in conditions and not (conditions['moist_range'][0] <= moisture[y, x] <= conditions['moist_range'][1]):
-                        matches = False
-                    if 'moist_max' in conditions and moisture[y, x] > conditions['moist_max']:
-                        matches = False
-                    if 'elev_range' in conditions and not (conditions['elev_range'][0] <= elevation[y, x] <= conditions['elev_range'][1]):
-                        matches = False
-                    
-                    if matches:
-                        biome_map[y, x] = biome
+        self.biome_predicates = compile_biome_cores(self.biome_cores)
+        self.terrain_mode = 'weighted'
+        self.stage_graph = None  # Built on the first regenerate_world_map call
+        self._hex_neighbors = None
 
-        # Fill remaining spaces based on temperature and moisture
-        for y in range(self.height):
-            for x in range(self.width):
-                if not biome_map[y, x]:
-                    # Use temperature and moisture to determine the best biome
-                    if temperature[y, x] > 0.7:
-                        biome_map[y, x] = 'Desert'
-                    elif temperature[y, x] < 0.25 and y <= self.height // 4:  # Only in top quarter
-                        biome_map[y, x] = 'Tundra'
-                    else:
-                        biome_map[y, x] = 'Grassland'
+    def __getstate__(self):
+        # Executors pickle bound methods with the whole generator. The stage graph
+        # holds local closures and hooks may be lambdas, and workers need neither.
+        state = self.__dict__.copy()
+        state['stage_graph'] = None
+        state['_hex_neighbors'] = None
+        state['stage_hooks'] = StageHooks()
+        state['stage_hooks'].context = dict(self.stage_hooks.context)
+        return state
+
+    @property
+    def hex_neighbors(self) -> HexNeighbors:
+        """Hex adjacency of the full map, shared by every stage that looks at neighbouring cells."""
+        if self._hex_neighbors is None:
+            self._hex_neighbors = HexNeighbors(self.height, self.width)
+        return self._hex_neighbors
+
+    def generate_biome_map(self, elevation: np.ndarray, temperature: np.ndarray, moisture: np.ndarray,
+                           executor=None) -> np.ndarray:
+        """Generate improved biome map ensuring all biomes are present."""
+        with self.stage('biome_classify'):
+            biome_map = self.classify_biome_bands(elevation, temperature, moisture, executor)
+        with self.stage('biome_ruins'):
+            self._place_biome_ruins(biome_map)
+        with self.stage('biome_smooth'):
+            biome_map = self.smooth_biomes(biome_map)
+        return biome_map
+
+    def smooth_biomes(self, biome_map: np.ndarray) -> np.ndarray:
+        """Absorb single-cell speckle and ragged edges using the rules' neighbor_weights.
+
+        Ocean follows the elevation cut and is left alone. See smooth_labels.
+        """
+        weights = self.biome_rules.neighbor_weight_matrix(BIOME_NAMES)
+        return smooth_labels(biome_map, weights, self.biome_smoothing['iterations'], fixed=[Biome.OCEAN],
+                             neighbors=self.hex_neighbors)
+
+    def classify_biome_bands(self, elevation: np.ndarray, temperature: np.ndarray, moisture: np.ndarray,
+                             executor=None) -> np.ndarray:
+        """Run classify_biomes over the whole map, one task per row band."""
+        return np.concatenate(run_tasks(executor, self.classify_biomes, [
+            (elevation[y0:y1], temperature[y0:y1], moisture[y0:y1], np.arange(y0, y1)[:, None])
+            for y0, y1 in self.row_bands()
+        ]))
+
+    def _place_biome_ruins(self, biome_map: np.ndarray):
+        """Scatter ruin sites over the biome map and turn the land around them Scorched and Wasteland."""
+        rng = self.stage_rng('biome_ruins')
 
         # Third pass: Place Ruins and create Wasteland/Scorched zones
-        ruin_positions = []
         ruins_to_place = min(5, (self.width * self.height) // 300)  # Increased number of ruins
+        sampler = self.ruin_sampler(rng)
+        interior = interior_mask(self.height, self.width, 5)
         
-        # Place ruins in different biomes
-        target_biomes = ['Desert', 'Grassland', 'Tundra']
-        for target_biome in target_biomes:
-            if len(ruin_positions) >= ruins_to_place:
-                break
-                
-            attempts = 0
-            while attempts < 100:
-                x = np.random.randint(5, self.width - 5)
-                y = np.random.randint(5, self.height - 5)
-                
-                if (biome_map[y, x] == target_biome and
-                    all(abs(rx - x) + abs(ry - y) > 15 for rx, ry in ruin_positions)):  # Reduced minimum distance
-                    ruin_positions.append((x, y))
-                    break
-                    
-                attempts += 1
+        # Place ruins in different biomes, one per biome the Ruins rules allow
+        valid_biomes = self.biome_rules.terrain_rules['Ruins'].get('valid_biomes', BIOME_IDS)
+        for target_biome in valid_biomes[:ruins_to_place]:
+            sampler.sample(interior & membership_table([target_biome], BIOME_IDS)[biome_map], max_count=1)
         
         # Create Wasteland and Scorched areas around ruins with more variation
-        for ruin_x, ruin_y in ruin_positions:
-            wasteland_radius = np.random.randint(4, 7)  # Variable radius
-            scorched_radius = np.random.randint(2, 4)   # Variable radius
+        for ruin_y, ruin_x in sampler.points:
+            wasteland_radius = rng.integers(4, 7)  # Variable radius
+            scorched_radius = rng.integers(2, 4)   # Variable radius
+            
+            y0, y1 = max(0, ruin_y - wasteland_radius), min(self.height, ruin_y + wasteland_radius + 1)
+            x0, x1 = max(0, ruin_x - wasteland_radius), min(self.width, ruin_x + wasteland_radius + 1)
+            dy = np.arange(y0, y1)[:, None] - ruin_y
+            dx = np.arange(x0, x1)[None, :] - ruin_x
+            distance = (dx ** 2 + dy ** 2) ** 0.5  # Using Euclidean distance
+            
+            window = biome_map[y0:y1, x0:x1]
+            affected = (window != Biome.OCEAN) & (distance <= wasteland_radius)
+            
+            # One roll per affected cell, drawn in row-major order
+            rolls = np.full(distance.shape, np.inf)
+            rolls[affected] = rng.random(np.count_nonzero(affected))
             
-            for dy in range(-wasteland_radius, wasteland_radius + 1):
-                for dx in range(-wasteland_radius, wasteland_radius + 1):
-                    y, x = ruin_y + dy, ruin_x + dx
-                    if not (0 <= y < self.height and 0 <= x < self.width):
-                        continue
-                    
-                    if biome_map[y, x] == 'Ocean':
-                        continue
-                        
-                    distance = (dx ** 2 + dy ** 2) ** 0.5  # Using Euclidean distance
-                    
-                    # Create Scorched core with irregular edges
-                    if distance <= scorched_radius:
-                        if np.random.random() < 0.8 - (distance / scorched_radius) * 0.3:
-                            biome_map[y, x] = 'Scorched'
-                    # Create Wasteland in the outer ring with irregular edges
-                    elif distance <= wasteland_radius:
-                        if np.random.random() < 0.6 - (distance / wasteland_radius) * 0.3:
-                            biome_map[y, x] = 'Wasteland'
+            # Create Scorched core with irregular edges
+            scorched = distance <= scorched_radius
+            window[scorched & (rolls < 0.8 - (distance / scorched_radius) * 0.3)] = Biome.SCORCHED
+            # Create Wasteland in the outer ring with irregular edges
+            window[~scorched & (rolls < 0.6 - (distance / wasteland_radius) * 0.3)] = Biome.WASTELAND
+
+    def classify_biomes(self, elevation: np.ndarray, temperature: np.ndarray, moisture: np.ndarray,
+                        rows: np.ndarray) -> np.ndarray:
+        """Assign Ocean, core and fill biomes from climate alone; ``rows`` are the world rows of the cells."""
+        biome_map = np.full(elevation.shape, UNASSIGNED, dtype=np.uint8)
+        fields = {
+            'elevation': elevation,
+            'temperature': temperature,
+            'moisture': moisture,
+            'row': rows
+        }
+        
+        # First pass: Place Ocean
+        ocean_mask = elevation < self.biome_cores['Ocean']['elev_max']
+        biome_map[ocean_mask] = Biome.OCEAN
+        unassigned = ~ocean_mask
         
+        # Second pass: Place core biomes in priority order, first match wins
+        for biome, clauses in self.biome_predicates:
+            matches = unassigned.copy()
+            for field, compare, bound in clauses:
+                matches &= compare(fields[field], bound)
+            biome_map[matches] = biome
+            unassigned &= ~matches
+
+        # Fill remaining spaces based on temperature and moisture
+        fill = np.select(
+            [temperature > 0.7,
+             (temperature < 0.25) & (rows <= self.height // 4)],  # Only in top quarter
+            [Biome.DESERT, Biome.TUNDRA],
+            Biome.GRASSLAND
+        )
+        biome_map[unassigned] = fill[unassigned]
+
         return biome_map
 
-    def get_neighbors(self, y: int, x: int, grid: np.ndarray) -> List[Tuple[int, int, Any]]:
-        """Get valid neighboring cells with their coordinates."""
-        neighbors = []
-        for dy in [-1, 0, 1]:
-            for dx in [-1, 0, 1]:
-                if dy == 0 and dx == 0:
-                    continue
-                ny, nx = y + dy, x + dx
-                if 0 <= ny < self.height and 0 <= nx < self.width:
-                    # Handle both numpy arrays and object arrays
-                    value = grid[ny][nx] if isinstance(grid[ny][nx], (str, type(None))) else grid[ny][nx].item()
-                    neighbors.append((ny, nx, value))
-        return neighbors
-
-    def generate_terrain_features(self, biome_map: np.ndarray, elevation: np.ndarray, moisture: np.ndarray) -> np.ndarray:
-        """Generate terrain features with improved distribution."""
-        terrain = np.full_like(biome_map, 'Ground', dtype=object)
-        ruin_positions = []
+    def generate_terrain_features(self, biome_map: np.ndarray, elevation: np.ndarray, moisture: np.ndarray,
+                                  mode: str = None, cluster_waves: int = None, executor=None) -> np.ndarray:
+        """Generate terrain features with improved distribution.
+
+        ``mode`` (``terrain_mode`` unless given) picks how features are
+        chosen: 'weighted' draws each cell's terrain from its biome's
+        terrain_weights (see _place_features_weighted); the cascade of
+        per-feature rolls either visits cells in row-major order like the
+        original loop ('raster') or resolves all cells in parallel waves
+        ('wavefront', see _place_features_wavefront).
+        """
+        mode = mode or self.terrain_mode
+        terrain = np.full_like(biome_map, Terrain.GROUND)
 
         # Place oceans first
         ocean_mask = elevation < 0.15
-        terrain[ocean_mask] = 'Ocean'
-        biome_map[ocean_mask] = 'Ocean'
+        terrain[ocean_mask] = Terrain.OCEAN
+        biome_map[ocean_mask] = Biome.OCEAN
             
         # Place ruins first
-        ruins_to_place = min(5, (self.width * self.height) // 300)
-        attempts = 0
-        max_attempts = 100
-    
-        while len(ruin_positions) < ruins_to_place and attempts < max_attempts:
-            x = np.random.randint(5, self.width - 5)
-            y = np.random.randint(5, self.height - 5)
-    
-            # Check if position is valid for ruins
-            if (terrain[y, x] != 'Ocean' and
-                all(abs(rx - x) + abs(ry - y) > 10 for rx, ry in ruin_positions)):
-        
-                terrain[y, x] = 'Ruins'
-                ruin_positions.append((x, y))
-        
-                # Create Wasteland and Scorched areas around the ruin
-                wasteland_radius = np.random.randint(4, 7)
-                scorched_radius = np.random.randint(2, 4)
+        with self.stage('terrain_ruins'):
+            rng = self.stage_rng('terrain_ruins')
+            ruins_to_place = min(5, (self.width * self.height) // 300)
+            valid_biomes = self.biome_rules.terrain_rules['Ruins'].get('valid_biomes', BIOME_IDS)
+            eligible_ruins = (interior_mask(self.height, self.width, 5) & (terrain != Terrain.OCEAN) &
+                              membership_table(valid_biomes, BIOME_IDS)[biome_map])
             
-                for dy in range(-wasteland_radius, wasteland_radius + 1):
-                    for dx in range(-wasteland_radius, wasteland_radius + 1):
-                        ny, nx = y + dy, x + dx
-                        if not (0 <= ny < self.height and 0 <= nx < self.width):
-                            continue
-                    
-                        if terrain[ny, nx] == 'Ocean':
-                            continue
-                        
-                        distance = ((dx ** 2 + dy ** 2) ** 0.5)
-                    
-                        # Create Scorched core
-                        if distance <= scorched_radius:
-                            if np.random.random() < 0.8:
-                                biome_map[ny, nx] = 'Scorched'
-                                if np.random.random() < 0.2:
-                                    terrain[ny, nx] = 'Ruins'
-                        # Create Wasteland in outer ring
-                        elif distance <= wasteland_radius:
-                            if np.random.random() < 0.7:
-                                biome_map[ny, nx] = 'Wasteland'
-                                if np.random.random() < 0.1:
-                                    terrain[ny, nx] = 'Ruins'
-            attempts += 1
+            # Sites are all chosen before any zone is stamped
+            for y, x in self.ruin_sampler(rng).sample(eligible_ruins, max_count=ruins_to_place):
+                terrain[y, x] = Terrain.RUINS
+                self._stamp_ruin_zone(biome_map, terrain, y, x, rng)
 
         # Generate other terrain features
-        for y in range(self.height):
-            for x in range(self.width):
-                if terrain[y, x] in ['Ocean', 'Ruins']:
-                    continue
+        open_cells = (terrain != Terrain.OCEAN) & (terrain != Terrain.RUINS)
+        chances = self.terrain_feature_chances()
+        eligible = self.terrain_feature_masks(open_cells, biome_map, elevation, moisture)
+        with self.stage('terrain_rolls'):
+            rolls = self.feature_rolls(1 if mode == 'weighted' else len(chances), executor)
+        
+        with self.stage('terrain_placement'):
+            if mode == 'weighted':
+                placed = self._place_features_weighted(eligible, chances, biome_map, rolls[0])
+            elif mode == 'raster':
+                placed = self._place_features_raster(eligible, chances, rolls)
+            elif mode == 'wavefront':
+                placed = self._place_features_wavefront(eligible, chances, rolls, cluster_waves)
+            else:
+                raise ValueError(f"Unknown terrain placement mode: {mode}")
+        
+        for index, (feature, _, _) in enumerate(chances):
+            terrain[placed == index] = TERRAIN_IDS[feature]
 
-                biome = biome_map[y, x]
-                elev = elevation[y, x]
-                moist = moisture[y, x]
+        return terrain
 
-                try:
-                    valid_terrains = self.biome_rules.get_valid_terrain_types(biome)
-                except (AttributeError, KeyError):
-                    # Fallback to default terrain if rules are missing
-                    continue
+    def ruin_sampler(self, rng: np.random.Generator) -> PoissonDiskSampler:
+        """Poisson-disk sampler spacing ruins by the Ruins min_spacing rule."""
+        spacing = self.biome_rules.terrain_rules['Ruins'].get('min_spacing', 0)
+        return PoissonDiskSampler(self.height, self.width, spacing, rng)
 
-                # Apply terrain features based on rules
-                for feature in ['Mountain', 'Forest', 'Hills', 'Lakes']:
-                    if feature not in valid_terrains:
-                        continue
-                    
-                    try:
-                        rules = self.biome_rules.terrain_rules.get(feature, {})
-                        if not rules:
-                            continue
-                        
-                        base_chance = rules.get('base_chance', 0.0)
-                        
-                        if ('valid_biomes' in rules and 
-                            biome not in rules['valid_biomes']):
-                            continue
-
-                        # Apply requirements
-                        if (rules.get('elevation_min', -1) > elev or
-                            rules.get('moisture_min', -1) > moist):
-                            continue
-
-                        # Apply clustering
-                        if 'cluster_chance' in rules:
-                            neighbors = self.get_neighbors(y, x, terrain)
-                            if any(n[2] == feature for n in neighbors):
-                                base_chance = max(base_chance, rules['cluster_chance'])
-
-                        if np.random.random() < base_chance:
-                            terrain[y, x] = feature
-                            break
-                    except Exception:
-                        continue
+    def _stamp_ruin_zone(self, biome_map: np.ndarray, terrain: np.ndarray, y: int, x: int,
+                         rng: np.random.Generator):
+        """Turn the area around a ruin into a Scorched core and Wasteland ring with scattered ruins."""
+        wasteland_radius = rng.integers(4, 7)
+        scorched_radius = rng.integers(2, 4)
+        
+        height, width = terrain.shape
+        y0, y1 = max(0, y - wasteland_radius), min(height, y + wasteland_radius + 1)
+        x0, x1 = max(0, x - wasteland_radius), min(width, x + wasteland_radius + 1)
+        dy = np.arange(y0, y1)[:, None] - y
+        dx = np.arange(x0, x1)[None, :] - x
+        distance = (dx ** 2 + dy ** 2) ** 0.5
+        rolls = rng.random((2,) + distance.shape)
+        land = terrain[y0:y1, x0:x1] != Terrain.OCEAN
+        
+        # Create Scorched core, then Wasteland in the outer ring
+        scorched = land & (distance <= scorched_radius) & (rolls[0] < 0.8)
+        wasteland = land & (distance > scorched_radius) & (distance <= wasteland_radius) & (rolls[0] < 0.7)
+        biome_map[y0:y1, x0:x1][scorched] = Biome.SCORCHED
+        biome_map[y0:y1, x0:x1][wasteland] = Biome.WASTELAND
+        terrain[y0:y1, x0:x1][(scorched & (rolls[1] < 0.2)) | (wasteland & (rolls[1] < 0.1))] = Terrain.RUINS
 
-        return terrain
+    def feature_rolls(self, features: int, executor=None) -> np.ndarray:
+        """One roll per cell and terrain feature, drawn per row band so bands can run in parallel."""
+        bands = self.row_bands()
+        return np.concatenate(run_tasks(executor, feature_rolls_band, [
+            (self.seed, band, y1 - y0, self.width, features) for band, (y0, y1) in enumerate(bands)
+        ]), axis=1).reshape(features, self.height, self.width)
+
+    def terrain_feature_chances(self) -> List[Tuple[str, float, float]]:
+        """(feature, base_chance, chance next to the same feature) in placement priority order."""
+        chances = []
+        for feature in TERRAIN_FEATURES:
+            rules = self.biome_rules.terrain_rules.get(feature, {})
+            if not rules:
+                continue
+            base_chance = rules.get('base_chance', 0.0)
+            cluster_chance = max(base_chance, rules.get('cluster_chance', base_chance))
+            chances.append((feature, base_chance, cluster_chance))
+        return chances
 
+    def terrain_feature_masks(self, open_cells: np.ndarray, biome_map: np.ndarray,
+                              elevation: np.ndarray, moisture: np.ndarray) -> np.ndarray:
+        """Stack of per-feature masks of cells where each feature's rules allow it."""
+        masks = []
+        for feature, _, _ in self.terrain_feature_chances():
+            rules = self.biome_rules.terrain_rules[feature]
+            biomes = [biome for biome, terrains in self.biome_rules.biome_terrain_mapping.items()
+                      if feature in terrains and biome in rules.get('valid_biomes', [biome])]
+            
+            # Apply requirements
+            mask = open_cells & membership_table(biomes, BIOME_IDS)[biome_map]
+            mask &= elevation >= rules.get('elevation_min', -1)
+            mask &= moisture >= rules.get('moisture_min', -1)
+            masks.append(mask)
+        return np.array(masks).reshape(-1, *open_cells.shape)
 
-    def generate_world_map(self) -> Dict[str, Any]:
-        # Generate base noise maps with different scales
-        elevation = self.generate_noise(scale=75.0, octaves=5)
+    def terrain_weight_tables(self, chances: List[Tuple[str, float, float]]) -> np.ndarray:
+        """Cumulative terrain probabilities indexed [biome, pattern, terrain].
+
+        Terrain 0 is Ground and terrain k + 1 is feature k of ``chances``.
+        Bit k of ``pattern`` is set when feature k is allowed in the cell.
+        Each row holds the biome's terrain_weights over Ground and the
+        features, normalized by their sum, and the weight of features the
+        cell's elevation and moisture rule out goes to Ground, so allowed
+        features keep exactly their configured share. Ruins weights are
+        ignored: ruins come from ruin_sampler, not from these draws. Rows
+        with no weight at all give Ground.
+        """
+        features = [feature for feature, _, _ in chances]
+        weights = self.biome_rules.terrain_weight_matrix(BIOME_NAMES, ['Ground'] + features)
+        patterns = np.arange(1 << len(features))
+        allowed = np.ones((patterns.size, len(features) + 1), dtype=bool)
+        allowed[:, 1:] = (patterns[:, None] >> np.arange(len(features))) & 1
         
-        # Generate base temperature with a north-south gradient
-        base_temperature = np.zeros((self.height, self.width))
-        for y in range(self.height):
-            # Create gradient from north (cold) to south (hot)
-            gradient = y / self.height  # 0 at north, 1 at south
-            base_temperature[y, :] = gradient
+        table = weights[:, None, :] * allowed[None]
+        table[..., 0] += (weights[:, None, :] * ~allowed[None]).sum(axis=2)
+        cumulative = np.cumsum(table, axis=2)
+        total = cumulative[..., -1:]
+        return np.divide(cumulative, total, out=np.ones_like(cumulative), where=total > 0)
+
+    def _place_features_weighted(self, eligible: np.ndarray, chances: List[Tuple[str, float, float]],
+                                 biome_map: np.ndarray, rolls: np.ndarray) -> np.ndarray:
+        """Draw each cell's terrain from its biome's weights with one roll per cell.
+
+        Cells are grouped by biome and by which features their rules allow,
+        and each group is resolved with one searchsorted into its
+        cumulative table, so the work is a handful of array passes however
+        big the map is. Cells left as Ground come back as -1, like the
+        other placement modes.
+        """
+        tables = self.terrain_weight_tables(chances)
+        patterns_per_biome = tables.shape[1]
+        pattern = np.zeros(biome_map.shape, dtype=np.uint16)
+        for index in range(len(chances)):
+            pattern |= eligible[index].astype(np.uint16) << index
         
-        # Add noise to temperature but maintain the gradient
-        temp_noise = self.generate_noise(scale=100.0, octaves=4)
-        temperature = base_temperature * 0.7 + temp_noise * 0.3  # Mix gradient and noise
+        # Cells that allow no feature stay Ground without a draw
+        cells = np.flatnonzero(pattern)
+        keys = biome_map.ravel()[cells].astype(np.int64) * patterns_per_biome + pattern.ravel()[cells]
+        order = np.argsort(keys, kind='stable')
+        cells, keys = cells[order], keys[order]
+        bounds = np.searchsorted(keys, np.arange(tables.shape[0] * patterns_per_biome + 1))
+        
+        placed = np.full(biome_map.size, -1, dtype=np.int8)
+        flat_rolls = rolls.ravel()
+        table_rows = tables.reshape(-1, tables.shape[2])
+        for key in np.flatnonzero(np.diff(bounds)).tolist():
+            group = cells[bounds[key]:bounds[key + 1]]
+            placed[group] = np.searchsorted(table_rows[key], flat_rolls[group], side='right') - 1
+        return placed.reshape(biome_map.shape)
+
+    def _place_features_raster(self, eligible: np.ndarray, chances: List[Tuple[str, float, float]],
+                               rolls: np.ndarray) -> np.ndarray:
+        """Visit cells in row-major order, checking eligible features until a roll succeeds.
+
+        A feature's cluster chance applies when an already visited neighbour
+        holds it, as in the original per-cell loop.
+        """
+        height, width = eligible.shape[1:]
+        stride = width + 2
+        # Cells still to be visited are never features, so only the four
+        # previously visited neighbours can raise the chance
+        behind = (-stride - 1, -stride, -stride + 1, -1)
         
-        moisture = self.generate_noise(scale=85.0, octaves=4)
+        padded = np.zeros((len(chances), height + 2, width + 2), dtype=bool)
+        padded[:, 1:-1, 1:-1] = eligible
+        flat_eligible = padded.reshape(len(chances), -1)
+        padded_rolls = np.ones((len(chances), height + 2, width + 2), dtype=rolls.dtype)
+        padded_rolls[:, 1:-1, 1:-1] = rolls
+        flat_rolls = padded_rolls.reshape(len(chances), -1)
+        feature_at = [-1] * ((height + 2) * stride)
+        rules = [(index, flat_eligible[index], flat_rolls[index], base_chance, cluster_chance)
+                 for index, (_, base_chance, cluster_chance) in enumerate(chances)]
         
-        # Adjust the transformations to create more variation
-        temperature = np.clip(temperature * 1.2 - 0.1, 0, 1)  # Maintain temperature range
-        moisture = np.clip(moisture * 1.3 - 0.15, 0, 1)      # Adjust moisture
+        for cell in np.flatnonzero(flat_eligible.any(axis=0)).tolist():
+            for index, allowed, roll, base_chance, cluster_chance in rules:
+                if not allowed[cell]:
+                    continue
+                
+                chance = base_chance
+                if cluster_chance > base_chance and any(feature_at[cell + offset] == index for offset in behind):
+                    chance = cluster_chance
+                
+                if roll[cell] < chance:
+                    feature_at[cell] = index
+                    break
         
-        # Keep elevation as is but ensure full range
-        elevation = np.clip(elevation * 1.2, 0, 1)
+        placed = np.array(feature_at, dtype=np.int8).reshape(height + 2, stride)
+        return placed[1:-1, 1:-1]
+
+    def _place_features_wavefront(self, eligible: np.ndarray, chances: List[Tuple[str, float, float]],
+                                  rolls: np.ndarray, cluster_waves: int = None, first_row: int = 0) -> np.ndarray:
+        """Place features in synchronous waves that do not depend on visiting order.
+
+        ``rolls`` holds one number per cell and feature. Wave 0 accepts
+        the first feature, in priority order, whose roll beats its
+        base_chance. Each later wave re-checks undecided cells next to
+        features placed in the previous wave, now using cluster_chance for
+        features present among their 6 hex neighbours. Waves repeat until
+        nothing changes or ``cluster_waves`` waves have run, and a cell is
+        never revisited once it holds a feature. Only the wavefront is
+        touched, so the total cost stays linear in the map size.
+        ``first_row`` is the world row of the first row of ``eligible``,
+        which sets the row parity of the hex layout for chunk regions.
+        """
+        features = len(chances)
+        if first_row & 1:
+            # Lead with an empty row so row 0 of the arrays is an even world row
+            eligible = np.concatenate([np.zeros_like(eligible[:, :1]), eligible], axis=1)
+            rolls = np.concatenate([np.ones_like(rolls[:, :1]), rolls], axis=1)
+        height, width = eligible.shape[1:]
+        size = height * width
+        if (height, width) == (self.height, self.width):
+            neighbors = self.hex_neighbors
+        else:
+            neighbors = HexNeighbors(height, width)
+        # Cells past the map edge point at one extra slot that never takes a feature
+        table = np.where(neighbors.table < 0, size, neighbors.table)
+        base_chance = np.array([chance[1] for chance in chances])[:, None]
+        cluster_chance = np.array([chance[2] for chance in chances])[:, None]
         
-        biome_map = self.generate_biome_map(elevation, temperature, moisture)
-        terrain_features = self.generate_terrain_features(biome_map, elevation, moisture)
+        allowed = np.zeros((features, size + 1), dtype=bool)
+        allowed[:, :-1] = eligible.reshape(features, -1)
+        rolls = np.append(rolls.reshape(features, -1), np.ones((features, 1), dtype=rolls.dtype), axis=1)
+        
+        # Cells that could still take a feature once a neighbour has it
+        could_grow = (allowed & (rolls < cluster_chance)).any(axis=0)
+        feature_at = np.full(size + 1, -1, dtype=np.int8)
+        slot = np.zeros(size + 1, dtype=np.int64)
+        
+        candidates = np.flatnonzero(allowed.any(axis=0))
+        near_feature = np.zeros((features, candidates.size), dtype=bool)
+        wave = 0
+        while candidates.size:
+            chance = np.where(near_feature, cluster_chance, base_chance)
+            hits = allowed[:, candidates] & (rolls[:, candidates] < chance)
+            won = hits.any(axis=0)
+            new_cells = candidates[won]
+            feature_at[new_cells] = hits[:, won].argmax(axis=0)
+            
+            wave += 1
+            if not new_cells.size or (cluster_waves is not None and wave > cluster_waves):
+                break
+            
+            # Next wave: undecided cells bordering this wave's placements,
+            # deduplicated through a scratch array to stay O(wavefront)
+            candidates = distinct(table[new_cells].ravel(), slot)
+            candidates = candidates[could_grow[candidates] & (feature_at[candidates] < 0)]
+            neighbours = feature_at[table[candidates]]
+            near_feature = np.array([(neighbours == index).any(axis=1) for index in range(features)])
+            near_feature = near_feature.reshape(features, candidates.size)
+        
+        return feature_at[:-1].reshape(height, width)[first_row & 1:]
+
+
+    def generate_world_map(self, executor=None) -> Dict[str, Any]:
+        """Generate the full map; the same seed always gives the same world.
+
+        Every random stage draws from its own generator derived from the
+        seed, so passing an executor (thread or process pool) to spread the
+        noise fields, biome bands and terrain rolls over workers does not
+        change the result.
+        """
+        # Generate base noise maps with different scales
+        fields = self.generate_noise_fields(executor)
+        
+        rows = np.arange(self.height)[:, None]
+        with self.stage('climate'):
+            elevation, temperature, moisture = self.apply_climate(
+                fields['elevation'], fields['temperature'], fields['moisture'], rows
+            )
+        
+        # Rivers and lakes make their surroundings wetter before biomes are chosen
+        with self.stage('hydrology'):
+            water = self.generate_hydrology(elevation)
+            moisture = self.apply_water(moisture, water)
+        
+        with self.stage('biome_map'):
+            biome_map = self.generate_biome_map(elevation, temperature, moisture, executor)
+        with self.stage('terrain_features'):
+            terrain_features = self.generate_terrain_features(biome_map, elevation, moisture,
+                                                              mode=self.terrain_mode, executor=executor)
+            self.place_lakes(terrain_features, water, biome_map)
         
         return {
             'terrain_height': elevation,
             'terrain_types': terrain_features,
             'temperature': temperature,
             'moisture': moisture,
-            'biomes': biome_map
+            'biomes': biome_map,
+            'rivers': water['rivers'],
+            'lakes': water['lakes']
         }
 
+    def generate_hydrology(self, elevation: np.ndarray) -> Dict[str, np.ndarray]:
+        """Drainage layers for the whole map: filled height, flow, rivers and lakes.
+
+        Water has to reach the map edge or the sea, so this needs the full
+        elevation field and is not run for streamed chunks. With hydrology
+        disabled the river and lake layers are empty.
+        """
+        settings = self.hydrology
+        if not settings['enabled']:
+            empty = np.zeros(elevation.shape, dtype=bool)
+            return {'rivers': empty, 'lakes': empty.copy()}
+        return drainage(elevation, settings['sea_level'], settings['river_min_area'], settings['lake_min_depth'])
+
+    def apply_water(self, moisture: np.ndarray, water: Dict[str, np.ndarray]) -> np.ndarray:
+        """Raise moisture on and next to rivers and lakes."""
+        wet = near(water['rivers'] | water['lakes'])
+        return np.clip(moisture + self.hydrology['wetness'] * wet, 0, 1)
+
+    def place_lakes(self, terrain: np.ndarray, water: Dict[str, np.ndarray], biome_map: np.ndarray):
+        """Turn flooded depressions into Lakes terrain, leaving Ocean (terrain or biome) and Ruins alone."""
+        lakes = (water['lakes'] & (biome_map != Biome.OCEAN) &
+                 (terrain != Terrain.OCEAN) & (terrain != Terrain.RUINS))
+        terrain[lakes] = Terrain.LAKES
+
+    def add_stage_hook(self, hook: StageHook, track_memory: bool = False):
+        """Call ``hook(event, stage, info)`` when each generation stage starts and ends.
+
+        See StageHooks for what ``info`` holds; ``track_memory`` turns on
+        peak memory measurement while the hook is registered.
+        """
+        self.stage_hooks.add(hook, track_memory)
+
+    def remove_stage_hook(self, hook: StageHook):
+        self.stage_hooks.remove(hook)
+
+    def stage(self, name: str):
+        """Context manager around one generation stage; a no-op while no hooks are registered."""
+        return self.stage_hooks.stage(name)
+
+    def generation_params(self) -> Dict[str, Any]:
+        """Everything besides seed and size that decides what generate_world_map produces."""
+        return {
+            'seed': self.seed,
+            'width': self.width,
+            'height': self.height,
+            'noise_fields': self.noise_fields,
+            'climate': self.climate,
+            'hydrology': self.hydrology,
+            'biome_cores': self.biome_cores,
+            'biome_smoothing': self.biome_smoothing,
+            'biome_rules': {
+                'rules': self.biome_rules.rules,
+                'terrain_rules': self.biome_rules.terrain_rules,
+                'biome_terrain_mapping': self.biome_rules.biome_terrain_mapping
+            },
+            'terrain_mode': self.terrain_mode,
+            'terrain_features': TERRAIN_FEATURES,
+            'rng_streams': RNG_STREAMS,
+            'rng_band_rows': RNG_BAND_ROWS
+        }
+
+    def build_pyramid(self, world_data: Dict[str, Any]) -> WorldPyramid:
+        """Downsampled copies of a generated world for zoomed-out views; see WorldPyramid."""
+        with self.stage('pyramid'):
+            return WorldPyramid(world_data)
+
+    def regenerate_world_map(self) -> Dict[str, Any]:
+        """Generate the full map through the memoized stage graph.
+
+        Gives the same world as generate_world_map, but each stage's output
+        is remembered by the hash of its parameters and inputs. After a
+        tweak to, say, ``climate`` or ``biome_cores`` only the stages
+        downstream of it run again; ``stage_graph.last_run`` lists them.
+        Returned arrays are shared with the graph and read-only.
+        """
+        if self.stage_graph is None:
+            self.stage_graph = self.build_stage_graph()
+        outputs = self.stage_graph.run(['watered_climate', 'hydrology', 'terrain'])
+        elevation, temperature, moisture = outputs['watered_climate']
+        terrain_features, biome_map = outputs['terrain']
+        return {
+            'terrain_height': elevation,
+            'terrain_types': terrain_features,
+            'temperature': temperature,
+            'moisture': moisture,
+            'biomes': biome_map,
+            'rivers': outputs['hydrology']['rivers'],
+            'lakes': outputs['hydrology']['lakes']
+        }
+
+    def build_stage_graph(self) -> StageGraph:
+        """Stages of generate_world_map: noise fields, climate and elevation, hydrology, biome classes, ruins and smoothing, terrain.
+
+        Parameters are read when the graph runs, so the generator's tables
+        can be edited in place between runs. Adding a noise field needs a
+        new graph.
+        """
+        def size():
+            return {'seed': self.seed, 'width': self.width, 'height': self.height}
+
+        def noise_stage(name):
+            return Stage(f'noise:{name}', lambda: self.generate_noise(**self.noise_fields[name]),
+                         params=lambda: dict(size(), **self.noise_fields[name]))
+
+        def water_climate(climate, water):
+            elevation, temperature, moisture = climate
+            return elevation, temperature, self.apply_water(moisture, water)
+
+        def classify(climate):
+            self.biome_predicates = compile_biome_cores(self.biome_cores)
+            return self.classify_biome_bands(*climate)
+
+        def place_biome_ruins(biome_map):
+            biome_map = biome_map.copy()
+            self._place_biome_ruins(biome_map)
+            return biome_map
+
+        def terrain(biome_map, climate, water):
+            elevation, _, moisture = climate
+            biome_map = biome_map.copy()
+            terrain_features = self.generate_terrain_features(biome_map, elevation, moisture, mode=self.terrain_mode)
+            self.place_lakes(terrain_features, water, biome_map)
+            return terrain_features, biome_map
+
+        noise_names = [f'noise:{name}' for name in ('elevation', 'temperature', 'moisture')]
+        return StageGraph([
+            *(noise_stage(name) for name in self.noise_fields),
+            Stage('climate', lambda *fields: self.apply_climate(*fields, np.arange(self.height)[:, None]),
+                  inputs=noise_names, params=lambda: dict(size(), **self.climate)),
+            # Drainage only reads elevation, so temperature and moisture tweaks leave it cached
+            Stage('elevation', self.scale_elevation, inputs=['noise:elevation'],
+                  params=lambda: {'elevation_scale': self.climate['elevation_scale']}),
+            Stage('hydrology', self.generate_hydrology, inputs=['elevation'],
+                  params=lambda: dict(size(), **self.hydrology)),
+            Stage('watered_climate', water_climate, inputs=['climate', 'hydrology'],
+                  params=lambda: {'wetness': self.hydrology['wetness']}),
+            Stage('biome_classify', classify, inputs=['watered_climate'],
+                  params=lambda: dict(size(), biome_cores=self.biome_cores)),
+            Stage('biome_ruins', place_biome_ruins, inputs=['biome_classify'],
+                  params=lambda: dict(size(), ruins=self.biome_rules.terrain_rules['Ruins'])),
+            Stage('biome_smooth', self.smooth_biomes, inputs=['biome_ruins'],
+                  params=lambda: dict(self.biome_smoothing, rules=self.biome_rules.rules)),
+            Stage('terrain', terrain, inputs=['biome_smooth', 'watered_climate', 'hydrology'],
+                  params=lambda: dict(size(),
+                                      terrain_mode=self.terrain_mode,
+                                      terrain_features=TERRAIN_FEATURES,
+                                      terrain_rules=self.biome_rules.terrain_rules,
+                                      rules=self.biome_rules.rules,
+                                      biome_terrain_mapping=self.biome_rules.biome_terrain_mapping))
+        ], run_stage=self._run_stage)
+
+    def _run_stage(self, name: str, call):
+        with self.stage(name):
+            return call()
+
+    def cached_world_map(self, cache_dir: str, executor=None, keep: int = None) -> Dict[str, Any]:
+        """Load this world from ``cache_dir``, generating and storing it on a miss.
+
+        Cached layers are memory-mapped rather than parsed. Files written
+        with different parameters for the same seed and size are removed,
+        and ``keep`` limits how many worlds the directory holds.
+        """
+        fingerprint = world_cache.params_fingerprint(self.generation_params())
+        path = world_cache.cache_path(cache_dir, self.seed, self.width, self.height, fingerprint)
+        world_data = world_cache.load_world(path, fingerprint)
+        if world_data is not None:
+            os.utime(path)  # Mark as recently used for pruning
+            return world_data
+
+        world_data = self.generate_world_map(executor)
+        world_cache.remove_stale(cache_dir, self.seed, self.width, self.height, fingerprint)
+        world_cache.save_world(path, world_data, fingerprint)
+        if keep is not None:
+            world_cache.prune(cache_dir, keep)
+        return world_data
+
+    def apply_climate(self, elevation: np.ndarray, temp_noise: np.ndarray, moisture: np.ndarray,
+                      rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Turn normalized noise into elevation, temperature and moisture for the given world rows."""
+        # Create gradient from north (cold) to south (hot), clamped outside the map's latitude span
+        base_temperature = np.clip(rows / self.height, 0, 1)  # 0 at north, 1 at south
+        
+        climate = self.climate
+        
+        # Add noise to temperature but maintain the gradient
+        temperature = (base_temperature * climate['temperature_gradient'] +
+                       temp_noise * climate['temperature_noise'])  # Mix gradient and noise
+        
+        # Adjust the transformations to create more variation
+        temperature = np.clip(temperature * climate['temperature_scale'] - climate['temperature_shift'], 0, 1)
+        moisture = np.clip(moisture * climate['moisture_scale'] - climate['moisture_shift'], 0, 1)
+        
+        return self.scale_elevation(elevation), temperature, moisture
+
+    def scale_elevation(self, elevation: np.ndarray) -> np.ndarray:
+        """Keep elevation as is but ensure full range."""
+        return np.clip(elevation * self.climate['elevation_scale'], 0, 1)
+
+    def generate_noise_fields(self, executor=None) -> Dict[str, np.ndarray]:
+        """Generate every layer in noise_fields, each normalized to 0-1."""
+        if executor is None:
+            fields = {}
+            for name, params in self.noise_fields.items():
+                with self.stage(f'noise:{name}'):
+                    fields[name] = self.generate_noise(**params)
+            return fields
+        
+        # Split every field into row bands and normalize once the bands are back.
+        # The fields run interleaved on the pool, so they are timed as one stage.
+        with self.stage('noise'):
+            tasks = [(name, y0, y1) for name in self.noise_fields for y0, y1 in self.row_bands()]
+            parts = run_tasks(executor, fractal_noise_band, [
+                (self.seed, 0, y0, self.width, y1 - y0, self.noise_fields[name]) for name, y0, y1 in tasks
+            ])
+            fields = {}
+            for name in self.noise_fields:
+                world = np.concatenate([part for (task_name, _, _), part in zip(tasks, parts) if task_name == name])
+                fields[name] = (world - world.min()) / (world.max() - world.min())
+        return fields
+
     def generate_noise(self, scale: float = 100.0, octaves: int = 6, 
                       persistence: float = 0.5, frequency: float = 2.0) -> np.ndarray:
         """Generate improved noise map with multiple octaves."""
-        world = np.zeros((self.height, self.width))
-        max_amplitude = 0.0
-        amplitude = 1.0
-        
-        for octave in range(octaves):
-            freq = frequency ** octave
-            max_amplitude += amplitude
-            
-            for y in range(self.height):
-                for x in range(self.width):
-                    world[y, x] += self.noise_gen.noise2(
-                        x * freq / scale, 
-                        y * freq / scale
-                    ) * amplitude
-            
-            amplitude *= persistence  # Move inside the octave loop
-        
-        # Normalize considering total amplitude
-        world /= max_amplitude
+        world = self.fractal_noise(0, 0, self.width, self.height, scale, octaves, persistence, frequency)
         
         # Ensure range is exactly 0-1
         world = (world - world.min()) / (world.max() - world.min())
         
-        return world
\ No newline at end of file
+        return world
+
+    def fractal_noise(self, x0: int, y0: int, width: int, height: int, scale: float, octaves: int,
+                      persistence: float = 0.5, frequency: float = 2.0) -> np.ndarray:
+        """Sum noise octaves over a window of world cells, divided by the total amplitude."""
+        return self.noise_gen.fractal(x0, y0, width, height, scale, octaves, persistence, frequency)
+
+    def stage_rng(self, stream: str, *keys: int) -> np.random.Generator:
+        """Random generator for one stage, optionally narrowed to a chunk or row band."""
+        return stage_rng(self.seed, stream, *keys)
+
+    def row_bands(self) -> List[Tuple[int, int]]:
+        """Fixed row bands that random draws and parallel work are split into."""
+        return [(y0, min(self.height, y0 + RNG_BAND_ROWS)) for y0 in range(0, self.height, RNG_BAND_ROWS)]
+
+    def generate_chunk_base(self, cx: int, cy: int) -> Dict[str, Any]:
+        """Generate every layer of a chunk except the clustered terrain features.
+
+        Noise is normalized to the fixed ``chunk_noise_range`` instead of the
+        chunk's own min/max, so neighbouring chunks line up exactly.
+        """
+        size = self.chunk_size
+        x0, y0 = cx * size, cy * size
+        low, high = self.chunk_noise_range
+        
+        fields = {}
+        for name, params in self.noise_fields.items():
+            raw = self.fractal_noise(x0, y0, size, size, **params)
+            fields[name] = np.clip((raw - low) / (high - low), 0, 1)
+        
+        rows = np.arange(y0, y0 + size)[:, None]
+        elevation, temperature, moisture = self.apply_climate(
+            fields['elevation'], fields['temperature'], fields['moisture'], rows
+        )
+        biome_map = self.classify_biomes(elevation, temperature, moisture, rows)
+        
+        terrain = np.full_like(biome_map, Terrain.GROUND)
+        ocean_mask = elevation < 0.15
+        terrain[ocean_mask] = Terrain.OCEAN
+        biome_map[ocean_mask] = Biome.OCEAN
+        self._place_chunk_ruin(cx, cy, biome_map, terrain)
+        
+        return {
+            'terrain_height': elevation,
+            'terrain_types': terrain,
+            'temperature': temperature,
+            'moisture': moisture,
+            'biomes': biome_map
+        }
+
+    def _place_chunk_ruin(self, cx: int, cy: int, biome_map: np.ndarray, terrain: np.ndarray):
+        """Maybe place one ruin with its Scorched/Wasteland zone fully inside the chunk."""
+        rng = self.stage_rng('terrain_ruins', cx, cy)
+        size = self.chunk_size
+        margin = 6  # Largest wasteland radius, keeps the zone off the chunk border
+        if size <= 2 * margin:
+            return
+        
+        y, x = rng.integers(margin, size - margin, 2)
+        if (rng.random() >= size * size / CELLS_PER_RUIN or
+                biome_map[y, x] not in [Biome.DESERT, Biome.GRASSLAND, Biome.TUNDRA]):
+            return
+        
+        terrain[y, x] = Terrain.RUINS
+        self._stamp_ruin_zone(biome_map, terrain, y, x, rng)
+
+    def chunk_feature_rolls(self, cx: int, cy: int) -> np.ndarray:
+        """Per-feature rolls for every cell of a chunk, used by wavefront placement."""
+        rng = self.stage_rng('terrain_features', cx, cy)
+        return rng.random((len(self.terrain_feature_chances()), self.chunk_size, self.chunk_size), dtype=np.float32)
+
+    def generate_chunk(self, cx: int, cy: int, get_base=None) -> Dict[str, Any]:
+        """Generate all layers for chunk (cx, cy), covering cells [cx * chunk_size, (cx + 1) * chunk_size).
+
+        With the 'weighted' terrain_mode features are drawn per cell from
+        the chunk alone, as for fixed maps. Other modes use wavefront
+        placement limited to ``chunk_cluster_waves`` waves over a halo of
+        that many cells taken from the neighbouring chunks. Either way
+        every cell only depends on its world position and chunks are
+        seamless. ``get_base`` can supply cached results of
+        generate_chunk_base for the neighbours.
+        """
+        get_base = get_base or self.generate_chunk_base
+        chances = self.terrain_feature_chances()
+        if self.terrain_mode == 'weighted':
+            # Weighted draws are per cell, so no halo is needed
+            base = get_base(cx, cy)
+            terrain = base['terrain_types'].copy()
+            open_cells = (terrain != Terrain.OCEAN) & (terrain != Terrain.RUINS)
+            eligible = self.terrain_feature_masks(open_cells, base['biomes'], base['terrain_height'], base['moisture'])
+            placed = self._place_features_weighted(eligible, chances, base['biomes'],
+                                                   self.chunk_feature_rolls(cx, cy)[0])
+        else:
+            base, terrain, placed = self._chunk_wavefront(cx, cy, get_base, chances)
+        
+        for index, (feature, _, _) in enumerate(chances):
+            terrain[placed == index] = TERRAIN_IDS[feature]
+        
+        chunk = dict(base)
+        chunk['terrain_types'] = terrain
+        return chunk
+
+    def _chunk_wavefront(self, cx: int, cy: int, get_base, chances: List[Tuple[str, float, float]]):
+        """Chunk base, its terrain and the wavefront features placed in it, resolved over a halo."""
+        size = self.chunk_size
+        halo = self.chunk_cluster_waves
+        if not 0 <= halo <= size:
+            raise ValueError(f"chunk_cluster_waves must be between 0 and chunk_size ({size})")
+        
+        around = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+        bases = {offset: get_base(cx + offset[0], cy + offset[1]) for offset in around}
+        rolls = {offset: self.chunk_feature_rolls(cx + offset[0], cy + offset[1]) for offset in around}
+        
+        def stitch(layers):
+            block = np.concatenate([
+                np.concatenate([layers[(dx, dy)] for dx in (-1, 0, 1)], axis=-1)
+                for dy in (-1, 0, 1)
+            ], axis=-2)
+            return block[..., size - halo:2 * size + halo, size - halo:2 * size + halo]
+        
+        biome_map = stitch({offset: base['biomes'] for offset, base in bases.items()})
+        terrain = stitch({offset: base['terrain_types'] for offset, base in bases.items()})
+        elevation = stitch({offset: base['terrain_height'] for offset, base in bases.items()})
+        moisture = stitch({offset: base['moisture'] for offset, base in bases.items()})
+        
+        open_cells = (terrain != Terrain.OCEAN) & (terrain != Terrain.RUINS)
+        eligible = self.terrain_feature_masks(open_cells, biome_map, elevation, moisture)
+        placed = self._place_features_wavefront(eligible, chances, stitch(rolls), halo,
+                                                first_row=cy * size - halo)
+        
+        inner = np.s_[halo:halo + size, halo:halo + size]
+        return bases[(0, 0)], terrain[inner].copy(), placed[inner]
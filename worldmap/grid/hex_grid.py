@@ -1,11 +1,64 @@
+import numpy as np
 from worldmap.display.tile_manager import TileManager
+from worldmap.config.world_settings import UNASSIGNED
+from worldmap.hex_neighbors import HexNeighbors
+
+# Tile fields returned by get_tile and the world_data layers that hold them
+TILE_LAYERS = {
+    'terrain': 'terrain_types',
+    'biome': 'biomes',
+    'height': 'terrain_height'
+}
+
+# dtype and empty value of each tile layer, used when tiles are set one by one
+TILE_LAYER_TYPES = {
+    'terrain_types': (np.uint8, UNASSIGNED),
+    'biomes': (np.uint8, UNASSIGNED),
+    'terrain_height': (np.float64, 0.0)
+}
+
 
 class HexGrid:
+    """Map cells stored as parallel arrays, one per layer, all (height, width).
+
+    ``layers`` maps world_data names ('biomes', 'terrain_types',
+    'terrain_height', and any others such as 'rivers') to arrays.
+    load_world takes the generator's arrays as they are, without copying,
+    so loading is O(1) and a tile costs only the bytes of its layers.
+    Further layers (visibility, occupancy, ...) can be added with
+    add_layer.
+
+    ``revision`` goes up whenever the tiles change, so caches built from
+    them (paths, flow fields, sight) know when to rebuild. Code that
+    writes into the layer arrays directly should call mark_changed.
+    """
+
     def __init__(self, width, height):
         self.width = width
         self.height = height
-        self.grid = [[None for x in range(width)] for y in range(height)]
+        self.layers = {}
         self.tile_manager = TileManager()
+        self._neighbors = None
+        self.revision = 0
+
+    @property
+    def neighbors(self):
+        """Hex adjacency of this grid's cells; see HexNeighbors."""
+        if self._neighbors is None:
+            self._neighbors = HexNeighbors(self.height, self.width)
+        return self._neighbors
+
+    @property
+    def biomes(self):
+        return self.layers.get('biomes')
+
+    @property
+    def terrain(self):
+        return self.layers.get('terrain_types')
+
+    @property
+    def heights(self):
+        return self.layers.get('terrain_height')
 
     def get_hex_position(self, row, col):
         # Convert grid coordinates to screen coordinates
@@ -17,20 +70,86 @@ class HexGrid:
         return x, y
 
     def get_grid_coordinates(self, screen_x, screen_y):
-        # Convert screen coordinates to grid coordinates
-        row = int(screen_y / self.tile_manager.hex_vert_offset)
-        col = int(screen_x / (self.tile_manager.hex_width * 0.75))
-        # Adjust for offset rows
-        if row % 2:
-            col = int((screen_x - self.tile_manager.hex_width * 0.375) / 
-                     (self.tile_manager.hex_width * 0.75))
-        return row, col
+        """Cell under a point given relative to the map origin, or None between hexes."""
+        rows, cols, hit = self.pick_cells(screen_x, screen_y, clip=False)
+        return (int(rows), int(cols)) if hit else None
+
+    def pick_cells(self, screen_x, screen_y, origin_x=0.0, origin_y=0.0, clip=True):
+        """Rows and columns of the hexes under screen points, for whole arrays of points at once.
+
+        ``origin_x``/``origin_y`` are where the top-left corner of cell
+        (0, 0) is drawn, i.e. camera plus map offset. Points are tested
+        against the exact hex outline, and where neighbouring tiles
+        overlap the one drawn last (later column, then later row) wins,
+        as on screen. Returns rows, cols and a mask of the points that hit
+        a hex; points between hexes, or off the map when ``clip`` is set,
+        have -1 for row and column. Each point checks a fixed handful of
+        candidate cells, so the cost is a few array passes per call.
+        """
+        hex_width = self.tile_manager.hex_width
+        hex_height = self.tile_manager.hex_height
+        step_x = hex_width * 0.75
+        step_y = self.tile_manager.hex_vert_offset
+        x = np.asarray(screen_x, dtype=np.float64) - origin_x
+        y = np.asarray(screen_y, dtype=np.float64) - origin_y
+
+        rows = np.full(x.shape, -1, dtype=np.int64)
+        cols = np.full(x.shape, -1, dtype=np.int64)
+        found = np.zeros(x.shape, dtype=bool)
+        last_row = np.floor(y / step_y).astype(np.int64)
+        # Tiles reaching over the point, latest drawn first
+        for row_back in range(int(np.ceil(hex_height / step_y))):
+            row = last_row - row_back
+            local_y = y - row * step_y
+            row_x = x - (row % 2) * hex_width * 0.375
+            last_col = np.floor(row_x / step_x).astype(np.int64)
+            for col_back in range(int(np.ceil(hex_width / step_x))):
+                col = last_col - col_back
+                hit = ~found & self._in_hex(row_x - col * step_x, local_y)
+                if clip:
+                    # Cells off the map are not drawn, so they cannot cover the one below
+                    hit &= (row >= 0) & (row < self.height) & (col >= 0) & (col < self.width)
+                rows[hit], cols[hit] = row[hit], col[hit]
+                found |= hit
+        return rows, cols, found
+
+    def _in_hex(self, local_x, local_y):
+        """Whether points relative to a tile's top-left corner fall inside its pointy-top hex."""
+        hex_width = self.tile_manager.hex_width
+        hex_height = self.tile_manager.hex_height
+        # 0 on the vertical centre line, 1 on the left and right edges
+        spread = np.abs(local_x - hex_width / 2) / (hex_width / 2)
+        return ((spread <= 1) &
+                (local_y >= hex_height / 4 * spread) &
+                (local_y <= hex_height - hex_height / 4 * spread))
+
+    def mark_changed(self):
+        self.revision += 1
+
+    def add_layer(self, name, dtype, fill=0):
+        """Add (or reset) a per-cell layer and return it."""
+        self.layers[name] = np.full((self.height, self.width), fill, dtype=dtype)
+        return self.layers[name]
 
     def set_tile(self, row, col, tile_data):
         if 0 <= row < self.height and 0 <= col < self.width:
-            self.grid[row][col] = tile_data
+            for field, name in TILE_LAYERS.items():
+                if name not in self.layers:
+                    self.add_layer(name, *TILE_LAYER_TYPES[name])
+                self.layers[name][row, col] = tile_data[field]
+            self.mark_changed()
+
+    def load_world(self, world_data):
+        """Use the layers of a generated world as the grid's own; arrays are shared, not copied."""
+        for name, layer in world_data.items():
+            if isinstance(layer, np.ndarray) and layer.shape == (self.height, self.width):
+                self.layers[name] = layer
+        self.mark_changed()
 
     def get_tile(self, row, col):
-        if 0 <= row < self.height and 0 <= col < self.width:
-            return self.grid[row][col]
-        return None
\ No newline at end of file
+        """Tile data for one cell as a dict, or None outside the map or where no tile was set."""
+        if not (0 <= row < self.height and 0 <= col < self.width) or 'terrain_types' not in self.layers:
+            return None
+        if self.layers['terrain_types'][row, col] == UNASSIGNED:
+            return None
+        return {field: self.layers[name][row, col] for field, name in TILE_LAYERS.items()}
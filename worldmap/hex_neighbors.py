@@ -0,0 +1,84 @@
+from typing import Iterator, Tuple
+import numpy as np
+
+# (row, col) steps to the six neighbours of a cell, by row parity. Odd rows
+# are drawn shifted right by half a column (HexGrid.get_hex_position), so
+# their diagonal neighbours are one column further right than an even row's.
+HEX_OFFSETS = (
+    ((0, -1), (0, 1), (-1, -1), (-1, 0), (1, -1), (1, 0)),  # Even rows
+    ((0, -1), (0, 1), (-1, 0), (-1, 1), (1, 0), (1, 1))     # Odd rows
+)
+
+
+class HexNeighbors:
+    """Precomputed hex adjacency for a (height, width) map of offset rows.
+
+    ``table[index]`` lists the flat indices (row * width + col) of a cell's
+    six neighbours, -1 past the map edge, in HEX_OFFSETS order. It is built
+    once, with array operations, the first time it is needed, and serves both whole-map gathers (see
+    gather) and per-cell walks (see around), so generation, smoothing and
+    pathfinding all agree on what touches what.
+    """
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+        self._table = None
+        # Flat index steps to the neighbours of cells away from the edges, by row parity
+        self.steps = tuple(tuple(dr * width + dc for dr, dc in parity) for parity in HEX_OFFSETS)
+
+    @property
+    def table(self) -> np.ndarray:
+        """(height * width, 6) int32 neighbour indices, built on first use."""
+        if self._table is None:
+            rows = np.arange(self.height)
+            # (height, 1, 6) steps picked by each row's parity
+            steps = np.array(HEX_OFFSETS)[rows % 2][:, None]
+            neighbor_rows = rows[:, None, None] + steps[..., 0]
+            neighbor_cols = np.arange(self.width)[None, :, None] + steps[..., 1]
+            inside = ((neighbor_rows >= 0) & (neighbor_rows < self.height) &
+                      (neighbor_cols >= 0) & (neighbor_cols < self.width))
+            self._table = np.where(inside, neighbor_rows * self.width + neighbor_cols, -1).astype(np.int32)
+            self._table = self._table.reshape(-1, 6)
+        return self._table
+
+    def around(self, row: int, col: int) -> Iterator[Tuple[int, int]]:
+        """(row, col) of each neighbour on the map, without building any list or array."""
+        for dr, dc in HEX_OFFSETS[row & 1]:
+            neighbor_row, neighbor_col = row + dr, col + dc
+            if 0 <= neighbor_row < self.height and 0 <= neighbor_col < self.width:
+                yield neighbor_row, neighbor_col
+
+    def around_index(self, index: int) -> Iterator[int]:
+        """Flat indices of each neighbour on the map."""
+        row, col = divmod(index, self.width)
+        if 0 < row < self.height - 1 and 0 < col < self.width - 1:
+            for step in self.steps[row & 1]:
+                yield index + step
+        else:
+            for neighbor_row, neighbor_col in self.around(row, col):
+                yield neighbor_row * self.width + neighbor_col
+
+    def gather(self, layer: np.ndarray, fill=0) -> np.ndarray:
+        """(height * width, 6) values of ``layer`` at every cell's neighbours, ``fill`` past the edge."""
+        padded = np.append(layer.ravel(), np.array(fill, dtype=layer.dtype))
+        return padded[self.table]
+
+    def counts(self, labels: np.ndarray, classes: int) -> np.ndarray:
+        """How many of each cell's neighbours carry each label, as a (classes, height, width) uint8 array.
+
+        Works on shifted slices of each label's mask, even and odd rows
+        apart, rather than through ``table``, which is several times faster
+        for whole maps.
+        """
+        counts = np.zeros((classes, self.height, self.width), dtype=np.uint8)
+        for label in range(classes):
+            padded = np.pad(labels == label, 1)
+            if not padded.any():
+                continue
+            for parity, offsets in enumerate(HEX_OFFSETS):
+                target = counts[label, parity::2]
+                for dr, dc in offsets:
+                    start = 1 + parity + dr
+                    target += padded[start:start + 2 * target.shape[0] - 1:2, 1 + dc:1 + dc + self.width]
+        return counts
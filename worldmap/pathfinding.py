@@ -0,0 +1,283 @@
+import heapq
+import math
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .config.world_settings import TERRAIN_IDS
+
+# Cost of entering a cell of each terrain; None is impassable
+TERRAIN_COSTS = {
+    'Ocean': None,
+    'Ground': 1.0,
+    'Hills': 2.0,
+    'Mountain': None,
+    'Forest': 2.0,
+    'Lakes': None,
+    'Ruins': 1.5
+}
+
+# Landmarks times cells spent on landmark tables when the count is left to the PathFinder
+LANDMARK_BUDGET = 500_000
+MAX_LANDMARKS = 16
+
+Cell = Tuple[int, int]
+
+
+def cost_table(terrain_costs: Dict[str, Optional[float]]) -> np.ndarray:
+    """256-entry table of entry costs by terrain id, inf where impassable or unknown."""
+    table = np.full(256, np.inf)
+    for name, cost in terrain_costs.items():
+        if name in TERRAIN_IDS and cost is not None:
+            table[TERRAIN_IDS[name]] = cost
+    return table
+
+
+def hex_distance(row_a: int, col_a: int, row_b: int, col_b: int) -> int:
+    """Steps between two cells of the offset-row layout, ignoring terrain."""
+    # Axial columns: odd rows sit half a column to the right
+    q_a = col_a - (row_a - (row_a & 1)) // 2
+    q_b = col_b - (row_b - (row_b & 1)) // 2
+    dq, dr = q_a - q_b, row_a - row_b
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+class PathFinder:
+    """Terrain-aware A* paths and Dijkstra reach over a HexGrid.
+
+    Moving into a cell costs its terrain's entry in ``terrain_costs``.
+    find_path runs A* guided by landmarks (ALT): every cell's true cost to
+    a few far-apart cells bounds the cost between any two cells by the
+    triangle inequality. Each search uses the ``active_landmarks`` that
+    bound its ends best, and hex distance times the cheapest terrain cost
+    without landmarks. ``landmarks`` defaults to as many as
+    LANDMARK_BUDGET allows for the grid's size, none on very large grids.
+    Found paths are cached; the cache, costs and landmarks are rebuilt
+    when the grid's revision changes.
+    """
+
+    def __init__(self, grid, terrain_costs: Dict[str, Optional[float]] = None, cache_size: int = 1024,
+                 landmarks: int = None, active_landmarks: int = 4):
+        self.grid = grid
+        self.terrain_costs = dict(TERRAIN_COSTS if terrain_costs is None else terrain_costs)
+        self.cache_size = cache_size
+        self.landmark_count = landmarks
+        self.active_landmarks = active_landmarks
+        self.paths: OrderedDict = OrderedDict()
+        self.costs: List[float] = []
+        self.axial_q: List[int] = []  # Per-cell axial column, for the distance heuristic
+        self.rows: List[int] = []
+        self.passable_around: List[int] = []  # Six entries per cell: neighbours that can be entered, -1 for the rest
+        self._landmarks: Optional[List[List[float]]] = None
+        self.min_cost = 1.0
+        self.revision = None
+        # Search state by flat index, kept between searches
+        self._best: List[float] = []
+        self._came_from: List[int] = []
+
+    def cost_layer(self) -> np.ndarray:
+        """(height, width) cost of entering each cell, inf where impassable."""
+        return cost_table(self.terrain_costs)[self.grid.terrain]
+
+    def refresh(self):
+        """Rebuild costs and drop cached paths and landmarks if the grid has changed since the last query."""
+        if self.revision == self.grid.revision:
+            return
+        layer = self.cost_layer()
+        self.costs = layer.ravel().tolist()
+        passable = layer[np.isfinite(layer)]
+        self.min_cost = float(passable.min()) if passable.size else 1.0
+        if len(self.axial_q) != layer.size:
+            rows = np.arange(self.grid.height)[:, None]
+            self.axial_q = (np.arange(self.grid.width)[None, :] - (rows - (rows & 1)) // 2).ravel().tolist()
+            self.rows = np.repeat(np.arange(self.grid.height), self.grid.width).tolist()
+            self._best = [math.inf] * layer.size
+            self._came_from = [-1] * layer.size
+        table = self.grid.neighbors.table
+        self.passable_around = np.where(np.append(np.isfinite(layer).ravel(), False)[table], table, -1).ravel().tolist()
+        self.paths.clear()
+        self._landmarks = None
+        self.revision = self.grid.revision
+
+    @property
+    def landmarks(self) -> List[List[float]]:
+        """Per landmark, every cell's cost to reach it (inf where it cannot), built on first use."""
+        self.refresh()
+        if self._landmarks is None:
+            self._landmarks = self._place_landmarks()
+        return self._landmarks
+
+    def _place_landmarks(self) -> List[List[float]]:
+        """Landmarks picked farthest-first across the map, starting from the first passable cell."""
+        # Imported here, flow_field builds on this module
+        from .flow_field import FlowField
+        passable = np.isfinite(self.costs)
+        count = self.landmark_count
+        if count is None:
+            count = min(MAX_LANDMARKS, LANDMARK_BUDGET // max(1, passable.size))
+        if not count or not passable.any():
+            return []
+        field = FlowField(self.grid, self.terrain_costs, max_cost=None)
+        nearest = np.full(passable.size, np.inf)
+        landmark = int(np.flatnonzero(passable)[0])
+        tables = []
+        for _ in range(count):
+            field.update(divmod(landmark, self.grid.width))
+            to_landmark = field.integration.ravel()
+            tables.append(to_landmark.tolist())
+            # Next landmark: the reachable cell furthest from all landmarks so far
+            nearest = np.minimum(nearest, to_landmark)
+            spread = np.where(np.isfinite(nearest), nearest, -1.0)
+            landmark = int(spread.argmax())
+            if spread[landmark] <= 0:
+                break
+        return tables
+
+    def find_path(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """Cheapest path from ``start`` to ``goal`` as (row, col) cells, both included, or None."""
+        self.refresh()
+        key = (start, goal)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            path = self.paths[key]
+        else:
+            path = self._search(start, goal)
+            self.paths[key] = path
+            while len(self.paths) > self.cache_size:
+                self.paths.popitem(last=False)
+        return list(path) if path is not None else None
+
+    def path_cost(self, path: List[Cell]) -> float:
+        """What walking ``path`` costs: the entry cost of every cell after the first."""
+        self.refresh()
+        return sum(self.costs[row * self.grid.width + col] for row, col in path[1:])
+
+    def _active_landmarks(self, start_index: int, goal_index: int) -> Optional[List[Tuple[List[float], float]]]:
+        """(table, goal's cost to the landmark) for the landmarks that bound this query best.
+
+        None when some landmark shows the two cells are on different
+        islands, so no path exists. An impassable start can still be left,
+        so it is judged by the cells it can step to.
+        """
+        costs = self.costs
+        if costs[start_index] == math.inf:
+            starts = [index for index in self.passable_around[6 * start_index:6 * start_index + 6] if index >= 0]
+            if not starts:
+                return None
+        else:
+            starts = [start_index]
+        ranked = []
+        for table in self.landmarks:
+            at_goal = table[goal_index]
+            at_start = min(table[index] for index in starts)
+            if at_goal == math.inf:
+                if max(table[index] for index in starts) < math.inf:
+                    return None  # Every start can reach the landmark, the goal cannot
+                continue  # Nothing to bound with
+            if at_start == math.inf:
+                return None  # The goal can reach the landmark, no start can
+            through = at_start - at_goal
+            bound = max(through, costs[goal_index] - costs[start_index] - through)
+            ranked.append((bound, table, at_goal))
+        ranked.sort(key=lambda entry: entry[0], reverse=True)
+        return [(table, at_goal) for _, table, at_goal in ranked[:self.active_landmarks]]
+
+    def _search(self, start: Cell, goal: Cell) -> Optional[Tuple[Cell, ...]]:
+        width, height = self.grid.width, self.grid.height
+        if not (0 <= start[0] < height and 0 <= start[1] < width and
+                0 <= goal[0] < height and 0 <= goal[1] < width):
+            return None
+        start_index = start[0] * width + start[1]
+        goal_index = goal[0] * width + goal[1]
+        costs = self.costs
+        if costs[goal_index] == math.inf:
+            return None
+        active = self._active_landmarks(start_index, goal_index)
+        if active is None:
+            return None
+
+        passable_around = self.passable_around
+        min_cost = self.min_cost
+        axial_q, rows = self.axial_q, self.rows
+        goal_row = goal[0]
+        goal_q = axial_q[goal_index]
+        goal_cost = costs[goal_index]
+        push, pop = heapq.heappush, heapq.heappop
+        best, came_from = self._best, self._came_from
+
+        best[start_index] = 0.0
+        came_from[start_index] = -1
+        touched = [start_index]
+        # Entries are (estimate, remaining estimate, cost so far, cell); ties go to cells nearer the goal
+        heap = [(0.0, 0.0, 0.0, start_index)]
+        path = None
+        while heap:
+            _, _, cost, current = pop(heap)
+            if current == goal_index:
+                path = self._walk_back(came_from, current)
+                break
+            if cost > best[current]:
+                continue
+
+            for neighbor in passable_around[6 * current:6 * current + 6]:
+                if neighbor < 0:
+                    continue
+                entry = costs[neighbor]
+                new_cost = cost + entry
+                if new_cost < best[neighbor]:
+                    if best[neighbor] == math.inf:
+                        touched.append(neighbor)
+                    best[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    if active:
+                        remaining = 0.0
+                        for table, at_goal in active:
+                            # The triangle inequality both ways round the landmark; walking a
+                            # path backwards swaps which end's entry cost it pays
+                            through = table[neighbor] - at_goal
+                            if through > remaining:
+                                remaining = through
+                            through = goal_cost - entry - through
+                            if through > remaining:
+                                remaining = through
+                    else:
+                        dq = axial_q[neighbor] - goal_q
+                        dr = rows[neighbor] - goal_row
+                        remaining = min_cost * ((abs(dq) + abs(dr) + abs(dq + dr)) // 2)
+                    push(heap, (new_cost + remaining, remaining, new_cost, neighbor))
+
+        for index in touched:
+            best[index] = math.inf
+        return path
+
+    def _walk_back(self, came_from: Dict[int, int], index: int) -> Tuple[Cell, ...]:
+        width = self.grid.width
+        path = []
+        while index >= 0:
+            path.append(divmod(index, width))
+            index = came_from[index]
+        return tuple(reversed(path))
+
+    def reachable(self, start: Cell, budget: float) -> Dict[Cell, float]:
+        """Every cell reachable from ``start`` for at most ``budget``, with its cheapest cost (Dijkstra)."""
+        self.refresh()
+        width, height = self.grid.width, self.grid.height
+        if not (0 <= start[0] < height and 0 <= start[1] < width):
+            return {}
+        costs = self.costs
+        passable_around = self.passable_around
+
+        start_index = start[0] * width + start[1]
+        best = {start_index: 0.0}
+        heap = [(0.0, start_index)]
+        while heap:
+            cost, current = heapq.heappop(heap)
+            if cost > best[current]:
+                continue
+            for neighbor in passable_around[6 * current:6 * current + 6]:
+                if neighbor < 0:
+                    continue
+                new_cost = cost + costs[neighbor]
+                if new_cost <= budget and new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    heapq.heappush(heap, (new_cost, neighbor))
+        return {divmod(index, width): cost for index, cost in best.items()}